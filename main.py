@@ -9,6 +9,7 @@ Este é o ponto de entrada da aplicação de varredura de rede.
 
 import os
 import sys
+import logging
 import tkinter as tk
 from tkinter import messagebox
 import platform
@@ -60,6 +61,9 @@ def create_directories():
 
 def main():
     """Função principal para iniciar a aplicação."""
+    # Configura o log da aplicação (mensagens informativas no console)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    
     try:
         # Cria os diretórios necessários
         create_directories()
@@ -9,21 +9,10 @@ Este módulo integra as visualizações 3D e geoespacial à interface principal.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
+from concurrent.futures import ThreadPoolExecutor
 import os
 import sys
 
-# Importa os módulos de visualização
-try:
-    from .network_3d_visualizer import Network3DVisualizer
-    from .geospatial_visualizer import GeoSpatialVisualizer
-except ImportError:
-    try:
-        from network_3d_visualizer import Network3DVisualizer
-        from geospatial_visualizer import GeoSpatialVisualizer
-    except ImportError:
-        print("Erro ao importar módulos de visualização. Verifique se os arquivos estão no mesmo diretório.")
-
 class AdvancedVisualizationManager:
     """Classe para gerenciar visualizações avançadas da rede."""
     
@@ -37,14 +26,18 @@ class AdvancedVisualizationManager:
         self.parent_gui = parent_gui
         self.scanner = parent_gui.scanner
         
-        # Inicializa os visualizadores
-        try:
-            self.network_3d_visualizer = Network3DVisualizer()
-            self.geospatial_visualizer = GeoSpatialVisualizer()
-            self.visualizers_available = True
-        except Exception as e:
-            print(f"Erro ao inicializar visualizadores: {e}")
-            self.visualizers_available = False
+        # Os visualizadores são importados e criados apenas no primeiro uso,
+        # pois dependem de bibliotecas pesadas (plotly, networkx, folium)
+        self.network_3d_visualizer = None
+        self.geospatial_visualizer = None
+        self.visualizers_available = True
+        
+        # Última visualização 3D gerada (evita regerar com os mesmos dados)
+        self._last_3d_key = None
+        self._last_3d_html = None
+        
+        # Thread única e persistente para gerar as visualizações
+        self._vis_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vis')
         
         # Cria a interface para visualizações avançadas
         self.create_advanced_visualization_tab()
@@ -130,24 +123,76 @@ class AdvancedVisualizationManager:
         self.vis_3d_button.config(state=tk.DISABLED)
         self.vis_geo_button.config(state=tk.DISABLED)
         
-        # Cria uma thread para não bloquear a interface
-        threading.Thread(target=self._generate_3d_visualization, daemon=True).start()
+        # Gera em segundo plano para não bloquear a interface
+        self._vis_executor.submit(self._generate_3d_visualization)
+    
+    def _get_scan_key(self):
+        """
+        Calcula uma chave que identifica o conteúdo atual da varredura.
+        
+        Usa a versão dos resultados mantida pelo scanner (incrementada a cada
+        alteração), sem serializar os resultados enquanto a varredura os altera.
+        
+        Returns:
+            tuple: Versão dos resultados, IP local e gateway
+        """
+        return (self.scanner.results_version, self.scanner.local_ip, self.scanner.gateway)
+    
+    def _get_network_3d_visualizer(self):
+        """
+        Obtém o visualizador 3D, importando o módulo no primeiro uso.
+        
+        Returns:
+            Network3DVisualizer: Instância do visualizador 3D
+        """
+        if self.network_3d_visualizer is None:
+            try:
+                from .network_3d_visualizer import Network3DVisualizer
+            except ImportError:
+                from network_3d_visualizer import Network3DVisualizer
+            self.network_3d_visualizer = Network3DVisualizer()
+        return self.network_3d_visualizer
+    
+    def _get_geospatial_visualizer(self):
+        """
+        Obtém o visualizador geoespacial, importando o módulo no primeiro uso.
+        
+        Returns:
+            GeoSpatialVisualizer: Instância do visualizador geoespacial
+        """
+        if self.geospatial_visualizer is None:
+            try:
+                from .geospatial_visualizer import GeoSpatialVisualizer
+            except ImportError:
+                from geospatial_visualizer import GeoSpatialVisualizer
+            self.geospatial_visualizer = GeoSpatialVisualizer()
+        return self.geospatial_visualizer
     
     def _generate_3d_visualization(self):
         """Gera a visualização 3D em uma thread separada."""
         try:
-            # Constrói o grafo da rede
-            self.network_3d_visualizer.build_network_graph(
-                self.scanner.scan_results,
-                self.scanner.local_ip,
-                self.scanner.gateway
-            )
+            # Carrega o visualizador (importação tardia)
+            network_3d_visualizer = self._get_network_3d_visualizer()
             
-            # Cria a visualização
-            html_file = self.network_3d_visualizer.create_3d_visualization("Visualização 3D da Rede")
+            # Reutiliza o arquivo gerado anteriormente se os dados não mudaram
+            key = self._get_scan_key()
+            if key == self._last_3d_key and self._last_3d_html and os.path.exists(self._last_3d_html):
+                html_file = self._last_3d_html
+            else:
+                # Constrói o grafo da rede
+                network_3d_visualizer.build_network_graph(
+                    self.scanner.scan_results,
+                    self.scanner.local_ip,
+                    self.scanner.gateway
+                )
+                
+                # Cria a visualização
+                html_file = network_3d_visualizer.create_3d_visualization("Visualização 3D da Rede")
+                self._last_3d_key = key
+                self._last_3d_html = html_file
             
             # Abre a visualização no navegador
-            self.network_3d_visualizer.open_visualization(html_file)
+            network_3d_visualizer.open_visualization(html_file)
             
             # Atualiza o status na thread principal
             self.parent_gui.root.after(0, lambda: self._update_vis_status(
@@ -155,9 +200,9 @@ class AdvancedVisualizationManager:
             ))
         except Exception as e:
             # Atualiza o status com o erro na thread principal
-            self.parent_gui.root.after(0, lambda: self._update_vis_status(
-                f"Erro ao gerar visualização 3D: {e}", "red"
-            ))
+            # (a mensagem é montada aqui pois 'e' deixa de existir após o except)
+            error_message = f"Erro ao gerar visualização 3D: {e}"
+            self.parent_gui.root.after(0, lambda: self._update_vis_status(error_message, "red"))
     
     def show_geospatial_visualization(self):
         """Exibe a visualização geoespacial da rede."""
@@ -174,14 +219,17 @@ class AdvancedVisualizationManager:
         self.vis_3d_button.config(state=tk.DISABLED)
         self.vis_geo_button.config(state=tk.DISABLED)
         
-        # Cria uma thread para não bloquear a interface
-        threading.Thread(target=self._generate_geospatial_visualization, daemon=True).start()
+        # Gera em segundo plano para não bloquear a interface
+        self._vis_executor.submit(self._generate_geospatial_visualization)
     
     def _generate_geospatial_visualization(self):
         """Gera a visualização geoespacial em uma thread separada."""
         try:
+            # Carrega o visualizador (importação tardia)
+            geospatial_visualizer = self._get_geospatial_visualizer()
+            
             # Cria a visualização
-            html_file = self.geospatial_visualizer.create_geospatial_visualization(
+            html_file = geospatial_visualizer.create_geospatial_visualization(
                 self.scanner.scan_results,
                 self.scanner.local_ip,
                 self.scanner.gateway,
@@ -189,7 +237,7 @@ class AdvancedVisualizationManager:
             )
             
             # Abre a visualização no navegador
-            self.geospatial_visualizer.open_visualization(html_file)
+            geospatial_visualizer.open_visualization(html_file)
             
             # Atualiza o status na thread principal
             self.parent_gui.root.after(0, lambda: self._update_vis_status(
@@ -197,9 +245,9 @@ class AdvancedVisualizationManager:
             ))
         except Exception as e:
             # Atualiza o status com o erro na thread principal
-            self.parent_gui.root.after(0, lambda: self._update_vis_status(
-                f"Erro ao gerar visualização geoespacial: {e}", "red"
-            ))
+            # (a mensagem é montada aqui pois 'e' deixa de existir após o except)
+            error_message = f"Erro ao gerar visualização geoespacial: {e}"
+            self.parent_gui.root.after(0, lambda: self._update_vis_status(error_message, "red"))
     
     def _update_vis_status(self, message, color):
         """
@@ -215,3 +263,7 @@ class AdvancedVisualizationManager:
         # Reabilita os botões
         self.vis_3d_button.config(state=tk.NORMAL)
         self.vis_geo_button.config(state=tk.NORMAL)
+    
+    def shutdown(self):
+        """Encerra a thread de geração de visualizações."""
+        self._vis_executor.shutdown(wait=False, cancel_futures=True)
@@ -12,11 +12,76 @@ import os
 import csv
 import json
 import datetime
-import shutil
+import heapq
+import logging
+import re
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# Tenta importar orjson (opcional, serialização mais rápida)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Sufixo do arquivo auxiliar com o resumo de cada varredura
+META_SUFFIX = ".meta"
+
+# Sufixo dos arquivos temporários usados durante o salvamento
+TEMP_SUFFIX = ".tmp"
+
+# Tamanho do buffer usado nas exportações (1 MiB)
+EXPORT_BUFFER_SIZE = 1 << 20
+
+# Nomes de arquivo sem separadores de diretório
+SAFE_FILENAME_RE = re.compile(r'^[\w.\-]+$')
+
+# Número máximo de threads para leitura do histórico
+HISTORY_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Campos de resumo exibidos no histórico e seus valores padrão
+HISTORY_SUMMARY_FIELDS = (
+    ('timestamp', 'Desconhecido'),
+    ('network', 'Desconhecido'),
+    ('total_devices', 0),
+    ('total_open_ports', 0)
+)
+
+# Valores padrão dos campos de um dispositivo nas exportações
+DEVICE_DEFAULTS = {
+    'hostname': 'Desconhecido',
+    'mac': 'Desconhecido',
+    'status': 'Desconhecido',
+    'ports': {}
+}
+
+# Modelo do bloco de cada dispositivo no relatório TXT
+DEVICE_TXT_TEMPLATE = "IP: {ip}\nHostname: {hostname}\nMAC: {mac}\nStatus: {status}\n{ports_block}\n"
+
+# Extrai (hostname, mac, status, ports) de um dispositivo já normalizado
+_device_fields = itemgetter('hostname', 'mac', 'status', 'ports')
+
+def _iter_device_rows(devices):
+    """
+    Normaliza os dispositivos de uma varredura para exportação.
+    
+    Args:
+        devices: Dicionário de dispositivos (IP -> dados)
+        
+    Yields:
+        tuple: (ip, hostname, mac, status, ports)
+    """
+    for ip, device in devices.items():
+        yield (ip, *_device_fields({**DEVICE_DEFAULTS, **device}))
 
 class DataManager:
     """Classe para gerenciamento de dados da aplicação."""
     
+    # Diretórios já garantidos durante a execução do processo
+    _ensured_dirs = set()
+    
     def __init__(self, base_dir="data"):
         """
         Inicializa o gerenciador de dados.
@@ -26,12 +91,38 @@ class DataManager:
         """
         self.base_dir = base_dir
         self.history_dir = os.path.join(base_dir, "history")
+        
+        # Cache do histórico: nome do arquivo -> (mtime_ns, tamanho, info)
+        self._history_cache = {}
+        
         self.ensure_directories()
+        
+        # Prefixo do diretório de histórico, usado para montar caminhos
+        self._history_dir_prefix = self.history_dir + os.sep
+    
+    def _history_path(self, filename):
+        """
+        Monta o caminho completo de um arquivo do histórico.
+        
+        Args:
+            filename: Nome do arquivo
+            
+        Returns:
+            str: Caminho completo do arquivo
+        """
+        # Nomes simples (sem separadores) são concatenados diretamente
+        if SAFE_FILENAME_RE.match(filename):
+            return self._history_dir_prefix + filename
+        return os.path.join(self.history_dir, filename)
     
     def ensure_directories(self):
         """Garante que os diretórios necessários existam."""
-        os.makedirs(self.base_dir, exist_ok=True)
-        os.makedirs(self.history_dir, exist_ok=True)
+        for directory in (self.base_dir, self.history_dir):
+            # Pula diretórios já criados/verificados neste processo
+            if directory in DataManager._ensured_dirs:
+                continue
+            os.makedirs(directory, exist_ok=True)
+            DataManager._ensured_dirs.add(directory)
     
     def save_scan_results(self, scan_data, filename=None):
         """
@@ -44,21 +135,46 @@ class DataManager:
         Returns:
             str: Caminho do arquivo salvo
         """
+        # Obtém a data e hora uma única vez para o nome do arquivo e o timestamp
+        now = datetime.datetime.now()
+        
         if filename is None:
             # Gera um nome de arquivo baseado na data e hora
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"scan_{timestamp}.json"
+            filename = f"scan_{now.strftime('%Y%m%d_%H%M%S')}.json"
         
-        filepath = os.path.join(self.history_dir, filename)
+        filepath = self._history_path(filename)
         
-        # Adiciona timestamp se não existir
+        # Adiciona timestamp se não existir (sem alterar o dicionário recebido)
         if 'timestamp' not in scan_data:
-            scan_data['timestamp'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            scan_data = {**scan_data, 'timestamp': now.isoformat(sep=' ', timespec='seconds')}
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(scan_data, f, indent=2)
+        # Escreve em um arquivo temporário e o renomeia de forma atômica,
+        # para que o histórico nunca veja um arquivo parcialmente escrito
+        temp_path = filepath + TEMP_SUFFIX
+        try:
+            # Usa orjson quando disponível, com fallback para o json padrão
+            if orjson is not None:
+                with open(temp_path, 'wb') as f:
+                    f.write(orjson.dumps(scan_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(scan_data, f, indent=2)
+            os.replace(temp_path, filepath)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
         
-        print(f"Resultados salvos em {filepath}")
+        # Salva um arquivo auxiliar pequeno com o resumo da varredura,
+        # evitando que o histórico precise ler a lista completa de dispositivos
+        meta = {key: scan_data.get(key, default) for key, default in HISTORY_SUMMARY_FIELDS}
+        try:
+            with open(filepath + META_SUFFIX, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        except OSError as e:
+            log.error("Erro ao salvar resumo da varredura %s: %s", filepath, e)
+        
+        log.info("Resultados salvos em %s", filepath)
         return filepath
     
     def load_scan_results(self, filename):
@@ -71,18 +187,59 @@ class DataManager:
         Returns:
             dict: Dados da varredura ou None se o arquivo não existir
         """
-        filepath = os.path.join(self.history_dir, filename)
+        filepath = self._history_path(filename)
         
-        if not os.path.exists(filepath):
-            print(f"Arquivo não encontrado: {filepath}")
+        try:
+            return self._read_json(filepath)
+        except FileNotFoundError:
+            log.warning("Arquivo não encontrado: %s", filepath)
             return None
+        except Exception as e:
+            log.error("Erro ao carregar arquivo %s: %s", filepath, e)
+            return None
+    
+    def _read_json(self, filepath):
+        """
+        Lê um arquivo JSON usando orjson quando disponível.
+        
+        Args:
+            filepath: Caminho completo do arquivo
+            
+        Returns:
+            dict: Dados do arquivo
+        """
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                return orjson.loads(f.read())
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _parse_history_entry(self, filename, filepath, stat):
+        """
+        Lê o resumo de uma varredura salva.
         
+        Args:
+            filename: Nome do arquivo da varredura
+            filepath: Caminho completo do arquivo
+            stat: Resultado de stat do arquivo
+            
+        Returns:
+            tuple: (filename, entrada_de_cache) ou None em caso de erro
+        """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data
+            # Prefere o arquivo de resumo; arquivos antigos não o possuem
+            try:
+                data = self._read_json(filepath + META_SUFFIX)
+            except FileNotFoundError:
+                data = self._read_json(filepath)
+            
+            # Extrai informações básicas
+            info = {'filename': filename, 'mtime_ns': stat.st_mtime_ns}
+            for key, default in HISTORY_SUMMARY_FIELDS:
+                info[key] = data.get(key, default)
+            return filename, (stat.st_mtime_ns, stat.st_size, info)
         except Exception as e:
-            print(f"Erro ao carregar arquivo {filepath}: {e}")
+            log.error("Erro ao processar arquivo %s: %s", filename, e)
             return None
     
     def get_scan_history(self):
@@ -90,35 +247,85 @@ class DataManager:
         Obtém a lista de varreduras salvas.
         
         Returns:
-            list: Lista de dicionários com informações sobre as varreduras
+            list: Lista de dicionários com informações sobre as varreduras,
+                  da mais recente para a mais antiga
+        """
+        return list(self.iter_recent_scans())
+    
+    def iter_recent_scans(self, limit=None):
+        """
+        Itera sobre as varreduras salvas, da mais recente para a mais antiga.
+        
+        Args:
+            limit: Número máximo de varreduras retornadas (opcional). Quando
+                   informado, apenas as `limit` mais recentes são ordenadas.
+            
+        Yields:
+            dict: Informações sobre cada varredura
+        """
+        history = self._load_history_summaries()
+        
+        key = itemgetter('mtime_ns')
+        if limit is None:
+            history.sort(key=key, reverse=True)
+            yield from history
+        else:
+            yield from heapq.nlargest(limit, history, key=key)
+    
+    def _load_history_summaries(self):
         """
-        history = []
+        Obtém os resumos de todas as varreduras salvas, sem ordenação.
+        
+        Os resumos de cada arquivo são mantidos em cache e só são relidos
+        quando o arquivo é modificado (mtime ou tamanho diferentes). Os
+        arquivos fora do cache são lidos em paralelo.
         
-        if not os.path.exists(self.history_dir):
-            return history
+        Returns:
+            list: Lista de dicionários com informações sobre as varreduras
+        """
+        cache = {}
+        misses = []
+        try:
+            entries = os.scandir(self.history_dir)
+        except FileNotFoundError:
+            return []
         
-        for filename in os.listdir(self.history_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.history_dir, filename)
+        with entries:
+            for entry in entries:
+                filename = entry.name
+                if not filename.endswith('.json') or not entry.is_file():
+                    continue
+                
                 try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # Extrai informações básicas
-                    info = {
-                        'filename': filename,
-                        'timestamp': data.get('timestamp', 'Desconhecido'),
-                        'network': data.get('network', 'Desconhecido'),
-                        'total_devices': data.get('total_devices', 0),
-                        'total_open_ports': data.get('total_open_ports', 0)
-                    }
-                    history.append(info)
-                except Exception as e:
-                    print(f"Erro ao processar arquivo {filename}: {e}")
-        
-        # Ordena por timestamp (mais recente primeiro)
-        history.sort(key=lambda x: x['timestamp'], reverse=True)
-        return history
+                    stat = entry.stat()
+                except OSError as e:
+                    log.error("Erro ao processar arquivo %s: %s", filename, e)
+                    continue
+                
+                cached = self._history_cache.get(filename)
+                if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                    cache[filename] = cached
+                else:
+                    misses.append((filename, entry.path, stat))
+        
+        # Lê os arquivos novos ou modificados em paralelo
+        if len(misses) == 1:
+            results = [self._parse_history_entry(*misses[0])]
+        elif misses:
+            max_workers = min(HISTORY_MAX_WORKERS, len(misses))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(lambda args: self._parse_history_entry(*args), misses))
+        else:
+            results = []
+        
+        for result in results:
+            if result is not None:
+                cache[result[0]] = result[1]
+        
+        # Descarta entradas de arquivos que não existem mais
+        self._history_cache = cache
+        
+        return [entry[2] for entry in cache.values()]
     
     def export_to_csv(self, scan_data, filepath):
         """
@@ -134,29 +341,25 @@ class DataManager:
         try:
             devices = scan_data.get('devices', {})
             
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+            # Gera as linhas sob demanda; o escape dos campos é feito pelo
+            # módulo csv (implementado em C) sem materializar todas as linhas
+            rows = (
+                (ip, hostname, mac, status, ', '.join(f"{port} ({service})" for port, service in ports.items()))
+                for ip, hostname, mac, status, ports in _iter_device_rows(devices)
+            )
+            
+            with open(filepath, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as csvfile:
                 writer = csv.writer(csvfile)
                 
-                # Escreve o cabeçalho
+                # Escreve o cabeçalho e os dados de todos os dispositivos
                 writer.writerow(['IP', 'Hostname', 'MAC', 'Status', 'Portas Abertas'])
-                
-                # Escreve os dados de cada dispositivo
-                for ip, device in devices.items():
-                    hostname = device.get('hostname', 'Desconhecido')
-                    mac = device.get('mac', 'Desconhecido')
-                    status = device.get('status', 'Desconhecido')
-                    
-                    # Formata as portas abertas
-                    ports = device.get('ports', {})
-                    ports_str = ', '.join([f"{port} ({service})" for port, service in ports.items()])
-                    
-                    writer.writerow([ip, hostname, mac, status, ports_str])
+                writer.writerows(rows)
             
-            print(f"Dados exportados para CSV: {filepath}")
+            log.info("Dados exportados para CSV: %s", filepath)
             return True
         
         except Exception as e:
-            print(f"Erro ao exportar para CSV: {e}")
+            log.error("Erro ao exportar para CSV: %s", e)
             return False
     
     def export_to_txt(self, scan_data, filepath):
@@ -171,46 +374,45 @@ class DataManager:
             bool: True se a exportação for bem-sucedida, False caso contrário
         """
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                # Escreve o cabeçalho
-                f.write("=== RELATÓRIO DE VARREDURA DE REDE ===\n\n")
-                f.write(f"Data/Hora: {scan_data.get('timestamp', 'Desconhecido')}\n")
-                f.write(f"Rede: {scan_data.get('network', 'Desconhecido')}\n")
-                f.write(f"IP Local: {scan_data.get('local_ip', 'Desconhecido')}\n")
-                f.write(f"Gateway: {scan_data.get('gateway', 'Desconhecido')}\n")
-                f.write(f"Total de Dispositivos: {scan_data.get('total_devices', 0)}\n")
-                f.write(f"Total de Portas Abertas: {scan_data.get('total_open_ports', 0)}\n\n")
-                
-                # Escreve os detalhes de cada dispositivo
-                f.write("--- DISPOSITIVOS ENCONTRADOS ---\n\n")
+            # Monta o relatório completo em memória e escreve de uma vez
+            parts = [
+                "=== RELATÓRIO DE VARREDURA DE REDE ===\n\n",
+                f"Data/Hora: {scan_data.get('timestamp', 'Desconhecido')}\n",
+                f"Rede: {scan_data.get('network', 'Desconhecido')}\n",
+                f"IP Local: {scan_data.get('local_ip', 'Desconhecido')}\n",
+                f"Gateway: {scan_data.get('gateway', 'Desconhecido')}\n",
+                f"Total de Dispositivos: {scan_data.get('total_devices', 0)}\n",
+                f"Total de Portas Abertas: {scan_data.get('total_open_ports', 0)}\n\n",
+                "--- DISPOSITIVOS ENCONTRADOS ---\n\n"
+            ]
+            
+            # Adiciona os detalhes de cada dispositivo
+            devices = scan_data.get('devices', {})
+            for ip, hostname, mac, status, ports in _iter_device_rows(devices):
+                # Lista as portas abertas
+                if ports:
+                    ports_block = "Portas Abertas:\n" + ''.join(
+                        f"  - {port}: {service}\n" for port, service in ports.items()
+                    )
+                else:
+                    ports_block = "Portas Abertas: Nenhuma\n"
                 
-                devices = scan_data.get('devices', {})
-                for ip, device in devices.items():
-                    hostname = device.get('hostname', 'Desconhecido')
-                    mac = device.get('mac', 'Desconhecido')
-                    status = device.get('status', 'Desconhecido')
-                    
-                    f.write(f"IP: {ip}\n")
-                    f.write(f"Hostname: {hostname}\n")
-                    f.write(f"MAC: {mac}\n")
-                    f.write(f"Status: {status}\n")
-                    
-                    # Lista as portas abertas
-                    ports = device.get('ports', {})
-                    if ports:
-                        f.write("Portas Abertas:\n")
-                        for port, service in ports.items():
-                            f.write(f"  - {port}: {service}\n")
-                    else:
-                        f.write("Portas Abertas: Nenhuma\n")
-                    
-                    f.write("\n")
+                parts.append(DEVICE_TXT_TEMPLATE.format_map({
+                    'ip': ip,
+                    'hostname': hostname,
+                    'mac': mac,
+                    'status': status,
+                    'ports_block': ports_block
+                }))
+            
+            with open(filepath, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                f.write(''.join(parts))
             
-            print(f"Dados exportados para TXT: {filepath}")
+            log.info("Dados exportados para TXT: %s", filepath)
             return True
         
         except Exception as e:
-            print(f"Erro ao exportar para TXT: {e}")
+            log.error("Erro ao exportar para TXT: %s", e)
             return False
     
     def delete_scan_result(self, filename):
@@ -223,18 +425,24 @@ class DataManager:
         Returns:
             bool: True se a remoção for bem-sucedida, False caso contrário
         """
-        filepath = os.path.join(self.history_dir, filename)
-        
-        if not os.path.exists(filepath):
-            print(f"Arquivo não encontrado: {filepath}")
-            return False
+        filepath = self._history_path(filename)
         
         try:
             os.remove(filepath)
-            print(f"Arquivo removido: {filepath}")
+            
+            # Remove também o arquivo de resumo, se existir
+            try:
+                os.remove(filepath + META_SUFFIX)
+            except FileNotFoundError:
+                pass
+            
+            log.info("Arquivo removido: %s", filepath)
             return True
+        except FileNotFoundError:
+            log.warning("Arquivo não encontrado: %s", filepath)
+            return False
         except Exception as e:
-            print(f"Erro ao remover arquivo {filepath}: {e}")
+            log.error("Erro ao remover arquivo %s: %s", filepath, e)
             return False
     
     def clear_history(self):
@@ -246,13 +454,18 @@ class DataManager:
         """
         try:
             if os.path.exists(self.history_dir):
-                shutil.rmtree(self.history_dir)
-                os.makedirs(self.history_dir)
-                print("Histórico de varreduras limpo com sucesso")
+                # Remove os arquivos mantendo o diretório existente
+                with os.scandir(self.history_dir) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            os.unlink(entry.path)
+                
+                self._history_cache.clear()
+                log.info("Histórico de varreduras limpo com sucesso")
                 return True
             return False
         except Exception as e:
-            print(f"Erro ao limpar histórico: {e}")
+            log.error("Erro ao limpar histórico: %s", e)
             return False
 
 
@@ -296,6 +509,9 @@ if __name__ == "__main__":
         }
     }
     
+    # Exibe as mensagens do módulo no console
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # Cria uma instância do gerenciador de dados
     data_manager = DataManager()
     
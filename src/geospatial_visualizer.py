@@ -9,23 +9,171 @@ usando Folium para mapas interativos.
 """
 
 import folium
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
 import tempfile
 import webbrowser
 import ipaddress
-import random
-from folium.plugins import MarkerCluster
+import itertools
+import math
+import socket
+import sqlite3
+import string
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from folium.plugins import FastMarkerCluster
+
+# Tenta importar geoip2 (opcional, geolocalização local via base MaxMind)
+try:
+    import geoip2.database
+    import geoip2.errors
+except ImportError:
+    geoip2 = None
+
+# Tenta importar orjson (opcional, leitura de JSON mais rápida)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Tenta importar htmlmin (opcional, reduz o tamanho do HTML gerado)
+try:
+    import htmlmin
+except ImportError:
+    htmlmin = None
+
+# Decodificador das respostas JSON (aceita os bytes do corpo diretamente)
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# Endpoint de geolocalização em lote do ip-api (até 100 IPs por requisição)
+IP_API_BATCH_URL = "http://ip-api.com/batch"
+IP_API_BATCH_SIZE = 100
+
+# Faixas IPv4 sem geolocalização (máscara, rede): 0/8, 10/8, 127/8,
+# 169.254/16, 172.16/12, 192.168/16 e 224/3 (multicast e reservados)
+PRIVATE_IPV4_RANGES = (
+    (0xFF000000, 0x00000000),
+    (0xFF000000, 0x0A000000),
+    (0xFF000000, 0x7F000000),
+    (0xFFFF0000, 0xA9FE0000),
+    (0xFFF00000, 0xAC100000),
+    (0xFFFF0000, 0xC0A80000),
+    (0xE0000000, 0xE0000000),
+)
+
+# Número máximo de consultas individuais de geolocalização simultâneas
+GEO_LOOKUP_WORKERS = 8
+
+# Modelos do popup e do tooltip de cada dispositivo
+POPUP_TEMPLATE = string.Template(
+    '<div style="width: 250px;">'
+    '<h4>$hostname</h4>'
+    '<b>IP:</b> $ip<br>'
+    '<b>MAC:</b> $mac<br>'
+    '<b>Sistema Operacional:</b> $os<br>'
+    '<b>Portas Abertas:</b><br>'
+    '$ports'
+    '</div>'
+)
+TOOLTIP_TEMPLATE = string.Template('$hostname ($ip)')
+
+# Função JavaScript que cria cada marcador a partir de uma linha
+# [latitude, longitude, popup, tooltip, cor], desenhado como círculo vetorial
+MARKER_CALLBACK_JS = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 6, color: row[4], fill: true, fillColor: row[4], fillOpacity: 0.9
+    });
+    marker.bindPopup(row[2], {maxWidth: 300});
+    marker.bindTooltip(row[3]);
+    return marker;
+}
+"""
+
+# Até este número de dispositivos, o mapa usa uma única camada GeoJSON;
+# acima dele, os marcadores são agrupados com FastMarkerCluster
+GEOJSON_MAX_DEVICES = 200
+
+# Ângulo áureo usado na distribuição em espiral de Fibonacci
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+# Serviços consultados para descobrir o IP público: (URL, leitura da resposta)
+PUBLIC_IP_SERVICES = (
+    ('https://api.ipify.org?format=json', lambda response: json_loads(response.content)['ip']),
+    ('https://ifconfig.me/ip', lambda response: response.text.strip()),
+)
+
+# Limite de consultas de geolocalização (token bucket): taxa sustentada por
+# minuto, abaixo do limite gratuito do ip-api (45/min), e rajada inicial
+GEO_RATE_PER_MINUTE = 40
+GEO_RATE_BURST = 10
+
+# Tempo limite (segundos) das requisições HTTP: (conexão, leitura)
+HTTP_TIMEOUT = (2, 3)
+
+# Novas tentativas, com espera exponencial, para falhas transitórias de HTTP
+HTTP_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.3
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Cache persistente de geolocalizações (válido por 24 horas)
+GEO_CACHE_PATH = os.path.join(tempfile.gettempdir(), "geoip_cache.db")
+GEO_CACHE_TTL = 24 * 60 * 60
+
+# Caminho padrão da base GeoLite2 (pode ser sobrescrito pela variável de ambiente)
+DEFAULT_GEOIP_DB_PATH = os.environ.get(
+    "GEOIP_DB_PATH",
+    os.path.join("data", "GeoLite2-City.mmdb")
+)
 
 class GeoSpatialVisualizer:
     """Classe para visualização geoespacial da rede."""
     
-    def __init__(self):
-        """Inicializa o visualizador geoespacial."""
+    def __init__(self, geoip_db_path=DEFAULT_GEOIP_DB_PATH):
+        """
+        Inicializa o visualizador geoespacial.
+        
+        Args:
+            geoip_db_path: Caminho da base GeoLite2-City (.mmdb) usada para
+                           geolocalização local, sem consultas HTTP
+        """
         self.ip_locations = {}
+        self.geoip_db_path = geoip_db_path
+        self._geo_reader = None
+        self._geo_reader_checked = False
+        
+        # Sessão HTTP compartilhada, reaproveitando conexões (keep-alive)
+        self._session = requests.Session()
+        retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_RETRY_BACKOFF,
+                      status_forcelist=HTTP_RETRY_STATUS)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        
+        # Limitador de taxa das consultas de geolocalização
+        self._rate_lock = threading.Lock()
+        self._rate_tokens = GEO_RATE_BURST
+        self._rate_updated = time.monotonic()
+        
+        # Abre o cache persistente de geolocalizações
+        self._cache_lock = threading.Lock()
+        try:
+            self._cache_db = sqlite3.connect(GEO_CACHE_PATH, check_same_thread=False)
+            self._cache_db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (ip TEXT PRIMARY KEY, lat REAL, lon REAL, ts INTEGER)"
+            )
+        except sqlite3.Error as e:
+            print(f"Erro ao abrir o cache de geolocalização: {e}")
+            self._cache_db = None
         self.default_location = [0, 0]  # Localização padrão (será ajustada)
         self.local_network_radius = 0.001  # Raio para dispositivos locais sem geolocalização
+        self._local_index = 0  # Posição na espiral do próximo dispositivo sem geolocalização
         
         # Cores padrão
         self.device_colors = {
@@ -34,14 +182,6 @@ class GeoSpatialVisualizer:
             'device': 'blue',
             'unknown': 'gray'
         }
-        
-        # Ícones padrão
-        self.device_icons = {
-            'gateway': 'globe',
-            'local': 'home',
-            'device': 'server',
-            'unknown': 'question-sign'
-        }
     
     def get_ip_geolocation(self, ip):
         """
@@ -53,6 +193,11 @@ class GeoSpatialVisualizer:
         Returns:
             tuple: (latitude, longitude) ou None se não for possível obter
         """
+        # Verifica se já temos a localização em cache (IPs privados já
+        # classificados ficam registrados com None)
+        if ip in self.ip_locations:
+            return self.ip_locations[ip]
+        
         # Verifica se é um IP privado
         try:
             if ipaddress.ip_address(ip).is_private:
@@ -60,25 +205,234 @@ class GeoSpatialVisualizer:
         except:
             return None
         
-        # Verifica se já temos a localização em cache
-        if ip in self.ip_locations:
-            return self.ip_locations[ip]
+        # Verifica o cache persistente
+        location = self._cache_get(ip)
+        if location:
+            self.ip_locations[ip] = location
+            return location
+        
+        # Consulta a base local, quando disponível
+        reader = self._get_geo_reader()
+        if reader is not None:
+            try:
+                response = reader.city(ip)
+                location = (response.location.latitude, response.location.longitude)
+                if None in location:
+                    location = None
+            except (geoip2.errors.AddressNotFoundError, ValueError):
+                location = None
+            self.ip_locations[ip] = location
+            return location
         
         try:
             # Usa a API ipinfo.io para obter a geolocalização
-            response = requests.get(f"https://ipinfo.io/{ip}/json")
+            self._throttle()
+            response = self._session.get(f"https://ipinfo.io/{ip}/json", timeout=HTTP_TIMEOUT)
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 if 'loc' in data:
                     # O formato é "latitude,longitude"
                     lat, lon = map(float, data['loc'].split(','))
                     self.ip_locations[ip] = (lat, lon)
+                    self._cache_put(ip, (lat, lon))
                     return (lat, lon)
         except Exception as e:
             print(f"Erro ao obter geolocalização para {ip}: {e}")
         
+        # Registra a falha para não consultar o mesmo IP novamente nesta execução
+        self.ip_locations[ip] = None
         return None
     
+    def _resolve_public_ips(self, ips):
+        """
+        Resolve a geolocalização de vários IPs públicos de uma só vez.
+        
+        Os IPs privados ou inválidos (identificados em lote) são registrados
+        sem localização e os já presentes no cache são ignorados. Os
+        demais são enviados ao endpoint de lote do ip-api (até 100 IPs por
+        requisição) e os resultados são armazenados em self.ip_locations.
+        
+        Args:
+            ips: Lista de endereços IP
+        """
+        # Remove duplicados e IPs já resolvidos
+        candidates = [ip for ip in dict.fromkeys(ips) if ip and ip not in self.ip_locations]
+        if not candidates:
+            return
+        
+        # Classifica todos os IPs de uma vez; privados e inválidos ficam
+        # registrados sem localização
+        ips_u32, valid = self._ipv4_to_u32(candidates)
+        public = valid & ~self._is_private_mask(ips_u32)
+        
+        pending = []
+        for ip, is_public in zip(candidates, public.tolist()):
+            if not is_public:
+                self.ip_locations[ip] = None
+                continue
+            
+            # Reaproveita localizações do cache persistente
+            location = self._cache_get(ip)
+            if location:
+                self.ip_locations[ip] = location
+                continue
+            pending.append(ip)
+        
+        if not pending:
+            return
+        
+        # Com a base local, a consulta é feita individualmente e sem rede
+        if self._get_geo_reader() is not None:
+            for ip in pending:
+                self.get_ip_geolocation(ip)
+            return
+        
+        for start in range(0, len(pending), IP_API_BATCH_SIZE):
+            batch = pending[start:start + IP_API_BATCH_SIZE]
+            try:
+                self._throttle()
+                response = self._session.post(
+                    IP_API_BATCH_URL,
+                    json=[{"query": ip} for ip in batch],
+                    params={"fields": "status,query,lat,lon"},
+                    timeout=HTTP_TIMEOUT
+                )
+                if response.status_code != 200:
+                    continue
+                for entry in json_loads(response.content):
+                    if entry.get('status') == 'success':
+                        location = (entry['lat'], entry['lon'])
+                        self.ip_locations[entry['query']] = location
+                        self._cache_put(entry['query'], location)
+            except Exception as e:
+                print(f"Erro ao obter geolocalização em lote: {e}")
+        
+        # IPs não resolvidos pelo lote são consultados individualmente, em paralelo
+        missing = [ip for ip in pending if ip not in self.ip_locations]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(GEO_LOOKUP_WORKERS, len(missing))) as executor:
+                list(executor.map(self.get_ip_geolocation, missing))
+    
+    def _throttle(self):
+        """
+        Aguarda, se necessário, até que uma nova consulta de geolocalização
+        possa ser feita sem exceder GEO_RATE_PER_MINUTE.
+        """
+        rate = GEO_RATE_PER_MINUTE / 60.0
+        with self._rate_lock:
+            now = time.monotonic()
+            self._rate_tokens = min(GEO_RATE_BURST,
+                                    self._rate_tokens + (now - self._rate_updated) * rate)
+            self._rate_updated = now
+            # Reserva uma ficha; se o balde estiver vazio, a espera fica com esta thread
+            self._rate_tokens -= 1
+            wait = -self._rate_tokens / rate if self._rate_tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _ipv4_to_u32(self, ips):
+        """
+        Converte endereços IPv4 em inteiros de 32 bits.
+        
+        Args:
+            ips: Lista de endereços IP
+            
+        Returns:
+            tuple: (array numpy.uint32 com os endereços, array booleano indicando
+                   os endereços IPv4 válidos)
+        """
+        values = np.zeros(len(ips), dtype=np.uint32)
+        valid = np.zeros(len(ips), dtype=bool)
+        for i, ip in enumerate(ips):
+            try:
+                values[i] = struct.unpack('>I', socket.inet_aton(ip))[0]
+                valid[i] = True
+            except (OSError, TypeError):
+                pass
+        return values, valid
+    
+    def _is_private_mask(self, ips_u32):
+        """
+        Identifica, de forma vetorizada, os endereços em faixas privadas ou reservadas.
+        
+        Args:
+            ips_u32: Array numpy.uint32 com os endereços IPv4
+            
+        Returns:
+            numpy.ndarray: Array booleano, True para endereços privados
+        """
+        mask = np.zeros(ips_u32.shape, dtype=bool)
+        for netmask, network in PRIVATE_IPV4_RANGES:
+            mask |= (ips_u32 & np.uint32(netmask)) == np.uint32(network)
+        return mask
+    
+    def _cache_get(self, ip):
+        """
+        Busca a localização de um IP no cache persistente.
+        
+        Args:
+            ip: Endereço IP
+            
+        Returns:
+            tuple: (latitude, longitude) ou None se ausente ou expirada
+        """
+        if self._cache_db is None:
+            return None
+        try:
+            with self._cache_lock:
+                row = self._cache_db.execute(
+                    "SELECT lat, lon FROM cache WHERE ip = ? AND ts > ?",
+                    (ip, int(time.time()) - GEO_CACHE_TTL)
+                ).fetchone()
+            return tuple(row) if row else None
+        except sqlite3.Error:
+            return None
+    
+    def _cache_put(self, ip, location):
+        """
+        Armazena a localização de um IP no cache persistente.
+        
+        Args:
+            ip: Endereço IP
+            location: Tupla (latitude, longitude)
+        """
+        if self._cache_db is None:
+            return
+        try:
+            with self._cache_lock:
+                self._cache_db.execute(
+                    "INSERT OR REPLACE INTO cache (ip, lat, lon, ts) VALUES (?, ?, ?, ?)",
+                    (ip, location[0], location[1], int(time.time()))
+                )
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar no cache de geolocalização: {e}")
+    
+    def _commit_cache(self):
+        """Grava no disco as alterações pendentes do cache persistente."""
+        if self._cache_db is None:
+            return
+        try:
+            with self._cache_lock:
+                self._cache_db.commit()
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar o cache de geolocalização: {e}")
+    
+    def _get_geo_reader(self):
+        """
+        Abre (uma única vez) a base GeoLite2 local.
+        
+        Returns:
+            geoip2.database.Reader: Leitor da base ou None se indisponível
+        """
+        if not self._geo_reader_checked:
+            self._geo_reader_checked = True
+            if geoip2 is not None and self.geoip_db_path and os.path.exists(self.geoip_db_path):
+                try:
+                    self._geo_reader = geoip2.database.Reader(self.geoip_db_path)
+                except Exception as e:
+                    print(f"Erro ao abrir a base de geolocalização {self.geoip_db_path}: {e}")
+        return self._geo_reader
+    
     def create_geospatial_visualization(self, scan_results, local_ip, gateway_ip, title="Visualização Geoespacial da Rede"):
         """
         Cria a visualização geoespacial da rede.
@@ -92,8 +446,13 @@ class GeoSpatialVisualizer:
         Returns:
             str: Caminho para o arquivo HTML da visualização
         """
-        # Obtém a localização do IP público
-        public_ip = self.get_public_ip()
+        # Obtém o IP público enquanto resolve as localizações dos dispositivos,
+        # para que os dispositivos consultem apenas o cache em memória
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            public_ip_future = executor.submit(self.get_public_ip)
+            self._resolve_public_ips(scan_results.keys())
+            public_ip = public_ip_future.result()
+        self._resolve_public_ips([public_ip])
         public_location = self.get_ip_geolocation(public_ip)
         
         # Define a localização central do mapa
@@ -110,27 +469,60 @@ class GeoSpatialVisualizer:
         '''
         m.get_root().html.add_child(folium.Element(title_html))
         
-        # Cria um cluster para dispositivos locais
-        local_cluster = MarkerCluster(name="Dispositivos Locais")
+        # Monta os dados dos marcadores (gateway, dispositivo local e demais)
+        rows = []
+        device_count = len(scan_results)
+        self._local_index = 0
+        
+        # Separa o gateway e o dispositivo local dos demais em uma única passagem
+        others = dict(scan_results)
+        gateway_data = others.pop(gateway_ip, None)
+        local_data = others.pop(local_ip, None)
         
         # Adiciona o gateway
-        if gateway_ip in scan_results:
-            self.add_device_to_map(m, local_cluster, gateway_ip, scan_results[gateway_ip], 
-                                  'gateway', local_ip, gateway_ip)
+        if gateway_data is not None:
+            rows.append(self.build_device_marker(gateway_ip, gateway_data, 'gateway', device_count))
         
         # Adiciona o dispositivo local
-        if local_ip in scan_results:
-            self.add_device_to_map(m, local_cluster, local_ip, scan_results[local_ip], 
-                                  'local', local_ip, gateway_ip)
+        if local_data is not None:
+            rows.append(self.build_device_marker(local_ip, local_data, 'local', device_count))
         
         # Adiciona os demais dispositivos
-        for ip, device_data in scan_results.items():
-            if ip != gateway_ip and ip != local_ip:
-                self.add_device_to_map(m, local_cluster, ip, device_data, 
-                                      'device', local_ip, gateway_ip)
-        
-        # Adiciona o cluster ao mapa
-        m.add_child(local_cluster)
+        for ip, device_data in others.items():
+            rows.append(self.build_device_marker(ip, device_data, 'device', device_count))
+        
+        if device_count <= GEOJSON_MAX_DEVICES:
+            # Para varreduras menores, todos os dispositivos vão em uma única
+            # camada GeoJSON, sem o custo do agrupamento
+            features = [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                    "properties": {"popup": popup, "tooltip": tooltip, "color": color}
+                }
+                for lat, lon, popup, tooltip, color in rows
+            ]
+            devices_layer = folium.GeoJson(
+                {"type": "FeatureCollection", "features": features},
+                name="Dispositivos Locais",
+                marker=folium.CircleMarker(radius=6, fill=True),
+                style_function=lambda feature: {
+                    "color": feature["properties"]["color"],
+                    "fillColor": feature["properties"]["color"],
+                    "fillOpacity": 0.9
+                },
+                popup=folium.GeoJsonPopup(fields=["popup"], labels=False),
+                tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False)
+            )
+        else:
+            # Cria um cluster para dispositivos locais; os marcadores são criados
+            # diretamente no navegador a partir da lista de linhas
+            devices_layer = FastMarkerCluster(
+                rows,
+                callback=MARKER_CALLBACK_JS,
+                name="Dispositivos Locais"
+            )
+        m.add_child(devices_layer)
         
         # Adiciona controle de camadas
         folium.LayerControl().add_to(m)
@@ -142,31 +534,47 @@ class GeoSpatialVisualizer:
         # Salva o mapa em um arquivo HTML temporário
         temp_dir = tempfile.gettempdir()
         html_file = os.path.join(temp_dir, "network_geospatial_visualization.html")
-        m.save(html_file)
+        html = m.get_root().render()
+        
+        # Remove espaços e comentários do HTML, quando htmlmin está disponível
+        if htmlmin is not None:
+            html = htmlmin.minify(html, remove_comments=True, remove_empty_space=True,
+                                  reduce_boolean_attributes=True)
+        
+        with open(html_file, 'w', encoding='utf-8') as f:
+            f.write(html)
+        
+        # Grava as novas geolocalizações no cache persistente
+        self._commit_cache()
         
         return html_file
     
-    def add_device_to_map(self, map_obj, cluster, ip, device_data, device_type, local_ip, gateway_ip):
+    def build_device_marker(self, ip, device_data, device_type, max_devices=1):
         """
-        Adiciona um dispositivo ao mapa.
+        Prepara os dados do marcador de um dispositivo no mapa.
         
         Args:
-            map_obj: Objeto do mapa Folium
-            cluster: Cluster para dispositivos locais
             ip: Endereço IP do dispositivo
             device_data: Dados do dispositivo
             device_type: Tipo do dispositivo ('gateway', 'local', 'device')
-            local_ip: IP do dispositivo local
-            gateway_ip: IP do gateway
+            max_devices: Número total de dispositivos, usado para escalar a espiral
+            
+        Returns:
+            list: [latitude, longitude, popup_html, tooltip, cor]
         """
         # Obtém a geolocalização do IP
         location = self.get_ip_geolocation(ip)
         
         # Se não conseguiu obter a geolocalização, usa uma localização próxima ao padrão
         if not location:
-            # Gera uma localização aleatória próxima ao centro para dispositivos locais
-            lat = self.default_location[0] + (random.random() - 0.5) * self.local_network_radius
-            lon = self.default_location[1] + (random.random() - 0.5) * self.local_network_radius
+            # Distribui os dispositivos locais em espiral de Fibonacci ao redor
+            # do centro (posição determinística, igual entre execuções)
+            i = self._local_index
+            self._local_index += 1
+            r = self.local_network_radius * math.sqrt(i + 1) / math.sqrt(max(max_devices, 1))
+            theta = i * GOLDEN_ANGLE
+            lat = self.default_location[0] + r * math.cos(theta)
+            lon = self.default_location[1] + r * math.sin(theta)
             location = (lat, lon)
         
         # Prepara o popup com informações do dispositivo
@@ -176,38 +584,24 @@ class GeoSpatialVisualizer:
         ports = device_data.get('ports', {})
         
         # Formata a lista de portas
-        ports_str = '<br>'.join([f"Porta {port}: {service}" for port, service in list(ports.items())[:10]])
-        if len(ports) > 10:
-            ports_str += f"<br>... e mais {len(ports) - 10} portas"
-        elif not ports:
+        port_count = len(ports)
+        ports_str = '<br>'.join(f"Porta {port}: {service}" for port, service in itertools.islice(ports.items(), 10))
+        if port_count > 10:
+            ports_str += f"<br>... e mais {port_count - 10} portas"
+        elif not port_count:
             ports_str = "Nenhuma porta aberta detectada"
         
         # Cria o conteúdo do popup
-        popup_content = f"""
-        <div style="width: 250px;">
-            <h4>{hostname}</h4>
-            <b>IP:</b> {ip}<br>
-            <b>MAC:</b> {mac}<br>
-            <b>Sistema Operacional:</b> {os_info}<br>
-            <b>Portas Abertas:</b><br>
-            {ports_str}
-        </div>
-        """
+        popup_content = POPUP_TEMPLATE.substitute(
+            hostname=hostname, ip=ip, mac=mac, os=os_info, ports=ports_str
+        )
         
-        # Determina a cor e o ícone com base no tipo de dispositivo
+        # Determina a cor com base no tipo de dispositivo
         color = self.device_colors.get(device_type, self.device_colors['unknown'])
-        icon = self.device_icons.get(device_type, self.device_icons['unknown'])
-        
-        # Cria o marcador
-        marker = folium.Marker(
-            location=location,
-            popup=folium.Popup(popup_content, max_width=300),
-            tooltip=f"{hostname} ({ip})",
-            icon=folium.Icon(color=color, icon=icon, prefix='glyphicon')
-        )
         
-        # Adiciona o marcador ao cluster para dispositivos locais
-        cluster.add_child(marker)
+        tooltip = TOOLTIP_TEMPLATE.substitute(hostname=hostname, ip=ip)
+        
+        return [location[0], location[1], popup_content, tooltip, color]
     
     def create_legend(self):
         """
@@ -246,19 +640,26 @@ class GeoSpatialVisualizer:
         Returns:
             str: Endereço IP público ou None se não for possível obter
         """
-        try:
-            response = requests.get('https://api.ipify.org?format=json')
-            if response.status_code == 200:
-                return response.json()['ip']
-        except:
-            pass
+        def fetch(url, parse):
+            response = self._session.get(url, timeout=HTTP_TIMEOUT)
+            if response.status_code != 200:
+                return None
+            return parse(response)
         
+        # Consulta os serviços em paralelo e usa a primeira resposta válida,
+        # sem esperar pelo serviço mais lento
+        executor = ThreadPoolExecutor(max_workers=len(PUBLIC_IP_SERVICES))
         try:
-            response = requests.get('https://ifconfig.me/ip')
-            if response.status_code == 200:
-                return response.text.strip()
-        except:
-            pass
+            futures = [executor.submit(fetch, url, parse) for url, parse in PUBLIC_IP_SERVICES]
+            for future in as_completed(futures):
+                try:
+                    public_ip = future.result()
+                except Exception:
+                    continue
+                if public_ip:
+                    return public_ip
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         return None
     
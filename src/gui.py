@@ -9,20 +9,30 @@ Este módulo contém a interface gráfica Tkinter para a ferramenta de varredura
 
 import os
 import sys
+import asyncio
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import tkinter.font as tkfont
 import threading
 import time
-import platform
+import random
 import webbrowser
 from datetime import datetime
 import ipaddress
 import math
+import functools
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from dataclasses import dataclass
+from types import MappingProxyType
+import numpy as np
 from PIL import Image, ImageTk, ImageDraw
 
 # Importa os módulos da aplicação
 try:
-    from network_scanner import NetworkScanner
+    from network_scanner import NetworkScanner, IS_WINDOWS
     from data_manager import DataManager
     from heatmap_utils import get_heat_color, create_heatmap_legend, get_heat_radius
     from advanced_visualization import AdvancedVisualizationManager
@@ -30,6 +40,155 @@ except ImportError:
     print("Erro ao importar módulos da aplicação. Verifique se os arquivos estão no mesmo diretório.")
     sys.exit(1)
 
+# Intervalo (ms) de verificação do relógio com a janela minimizada
+CLOCK_HIDDEN_INTERVAL = 5000
+
+# Intervalo (ms) de verificação do término da varredura após a interrupção
+STOP_POLL_INTERVAL = 50
+
+# Atraso (ms) para agrupar pedidos de atualização da visualização
+VIS_UPDATE_DELAY = 100
+
+# Intervalo (ms) para agrupar os dispositivos encontrados antes de inseri-los na tabela
+DEVICE_FLUSH_INTERVAL = 50
+
+# Intervalo (ms) para agrupar as portas encontradas antes de inseri-las na tabela
+PORT_FLUSH_INTERVAL = 50
+
+# Número de portas acima do qual a varredura pede confirmação ao usuário
+LARGE_PORT_RANGE = 10000
+
+# Colunas das listas de histórico: (identificador, título, largura, alinhamento);
+# o nome do arquivo deve ser a última coluna
+HISTORY_COLUMNS = (
+    ("timestamp", "Data/Hora", 150, tk.W),
+    ("network", "Rede", 120, tk.W),
+    ("devices", "Dispositivos", 100, tk.CENTER),
+    ("ports", "Portas Abertas", 100, tk.CENTER),
+    ("filename", "Arquivo", 200, tk.W),
+)
+
+# Número de iterações do layout de força calculado em segundo plano
+FORCE_LAYOUT_ITERATIONS = 50
+
+# Número de linhas do histórico inseridas por vez nas listas dos diálogos
+HISTORY_CHUNK_SIZE = 200
+
+# Descrições comuns de serviços (somente leitura, chaves já em minúsculas)
+SERVICE_DESCRIPTIONS = MappingProxyType({
+    'http': 'Servidor Web (HTTP)',
+    'https': 'Servidor Web Seguro (HTTPS)',
+    'ftp': 'Servidor de Transferência de Arquivos (FTP)',
+    'ssh': 'Acesso Remoto Seguro (SSH)',
+    'telnet': 'Acesso Remoto (Telnet)',
+    'smtp': 'Servidor de E-mail (SMTP)',
+    'pop3': 'Recebimento de E-mail (POP3)',
+    'imap': 'Acesso a E-mail (IMAP)',
+    'dns': 'Servidor de Nomes (DNS)',
+    'dhcp': 'Configuração Automática de Rede (DHCP)',
+    'rdp': 'Área de Trabalho Remota (RDP)',
+    'vnc': 'Controle Remoto (VNC)',
+    'mysql': 'Banco de Dados MySQL',
+    'mssql': 'Banco de Dados Microsoft SQL Server',
+    'smb': 'Compartilhamento de Arquivos Windows (SMB)',
+    'netbios': 'Serviço de Rede Windows (NetBIOS)',
+    'snmp': 'Gerenciamento de Rede (SNMP)',
+    'ldap': 'Diretório de Rede (LDAP)',
+    'ntp': 'Sincronização de Tempo (NTP)',
+    'irc': 'Chat (IRC)',
+    'pptp': 'VPN Point-to-Point (PPTP)',
+    'l2tp': 'VPN Layer 2 (L2TP)',
+    'openvpn': 'VPN OpenVPN',
+    'ipsec': 'VPN IPsec',
+    'sip': 'Telefonia IP (SIP)',
+    'rtsp': 'Streaming de Mídia (RTSP)',
+    'http-proxy': 'Proxy HTTP',
+    'socks': 'Proxy SOCKS',
+    'unknown': 'Serviço Desconhecido'
+})
+
+# Dicionário de portas vazio e somente leitura, compartilhado como valor padrão
+EMPTY_PORTS = MappingProxyType({})
+
+def clear_treeview(tree):
+    """
+    Remove todas as linhas de uma Treeview em uma única chamada ao Tk.
+    
+    Args:
+        tree: Treeview a ser limpa
+    """
+    children = tree.get_children()
+    if children:
+        tree.delete(*children)
+
+@functools.lru_cache(maxsize=1024)
+def ip_sort_key(ip):
+    """
+    Obtém a chave de ordenação numérica de um endereço IPv4.
+    
+    Args:
+        ip: Endereço IP
+        
+    Returns:
+        tuple: Octetos do endereço como inteiros
+    """
+    return tuple(map(int, ip.split('.')))
+
+def compute_force_layout(positions, iterations=FORCE_LAYOUT_ITERATIONS):
+    """
+    Calcula um layout de força (Fruchterman-Reingold) com NumPy.
+    
+    Os dispositivos se repelem entre si e são atraídos pelo centro da área,
+    onde fica o gateway.
+    
+    Args:
+        positions: Posições iniciais (x, y) de cada dispositivo, relativas à área (0 a 1)
+        iterations: Número de iterações do algoritmo
+        
+    Returns:
+        list: Posições finais (x, y) de cada dispositivo, relativas à área (0 a 1)
+    """
+    if not positions:
+        return []
+    
+    # O nó 0 é o centro (gateway) e permanece fixo
+    pos = np.array([(0.5, 0.5)] + list(positions), dtype=float)
+    
+    # Distância ideal entre os nós e temperatura inicial
+    k = 0.5 * math.sqrt(1.0 / len(pos))
+    temperature = 0.1
+    cooling = temperature / iterations
+    
+    for _ in range(iterations):
+        # Repulsão entre todos os pares de nós: k² / d na direção do vetor entre eles
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist2 = np.maximum((delta ** 2).sum(axis=-1), 1e-4)
+        disp = (delta * (k * k / dist2)[..., None]).sum(axis=1)
+        
+        # Atração das ligações com o centro: d² / k na direção do centro
+        edge = pos[1:] - pos[0]
+        edge_len = np.sqrt((edge ** 2).sum(axis=-1))
+        disp[1:] -= edge * (edge_len / k)[:, None]
+        
+        # Desloca cada dispositivo no máximo pela temperatura atual
+        length = np.maximum(np.sqrt((disp[1:] ** 2).sum(axis=-1)), 1e-4)
+        pos[1:] += disp[1:] / length[:, None] * np.minimum(length, temperature)[:, None]
+        np.clip(pos, 0.0, 1.0, out=pos)
+        temperature -= cooling
+    
+    return [tuple(p) for p in pos[1:].tolist()]
+
+@dataclass(slots=True)
+class DeviceRecord:
+    """Dados de um dispositivo exibido na tabela."""
+    ip: str
+    hostname: str
+    mac: str
+    status: str
+    os_name: str
+    os_confidence: float | None  # None quando a varredura não tem informação de SO
+    ports: dict
+
 class NetworkScannerGUI:
     """Classe principal da interface gráfica."""
     
@@ -45,9 +204,6 @@ class NetworkScannerGUI:
         self.root.geometry("1000x700")
         self.root.minsize(800, 600)
         
-        # Configura o ícone da aplicação (será substituído por um ícone real)
-        self.create_default_icon()
-        
         # Inicializa os módulos da aplicação
         self.scanner = NetworkScanner()
         self.data_manager = DataManager()
@@ -55,9 +211,39 @@ class NetworkScannerGUI:
         # Variáveis de controle
         self.scan_running = False
         self.scan_thread = None
-        self.port_scan_threads = {}
+        self._last_progress = 0
+        self._port_scans = {}
+        self._port_loop = None
         self.selected_device = None
         
+        # Dados dos dispositivos exibidos (IP -> DeviceRecord; o IP também é o
+        # identificador da linha na tabela) e fila de dispositivos a inserir
+        self._devices = {}
+        self._sorted_ips = []
+        self._pending_devices = deque()
+        self._device_flush_scheduled = False
+        
+        # Fila de portas encontradas a inserir na tabela de portas
+        self._pending_ports = deque()
+        self._port_flush_scheduled = False
+        
+        # Janelas de histórico, criadas na primeira abertura e depois apenas ocultadas
+        self._load_window = None
+        self._load_list = None
+        self._manage_window = None
+        self._manage_list = None
+        self._history_fills = {}
+        
+        # Janelas de ajuda e sobre, de conteúdo fixo, também reaproveitadas
+        self._help_window = None
+        self._about_window = None
+        
+        # Conjunto de portas abertas conhecidas de cada dispositivo (IP -> set)
+        self._open_ports_by_ip = {}
+        
+        # Maior número de portas abertas entre os dispositivos (None = recalcular)
+        self._cached_max_ports = None
+        
         # Configura o tema da interface
         self.setup_theme()
         
@@ -75,39 +261,68 @@ class NetworkScannerGUI:
         # Configura o manipulador de fechamento da janela
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
-        # Inicia a verificação periódica do status da varredura
-        self.check_scan_status()
+        # Prepara o ícone da aplicação em segundo plano, sem atrasar a abertura da janela
+        threading.Thread(target=self._build_icon_async, daemon=True).start()
     
     def create_default_icon(self):
-        """Cria um ícone padrão para a aplicação."""
+        """
+        Cria um ícone padrão para a aplicação.
+        
+        Returns:
+            PIL.Image.Image: Imagem do ícone
+        """
+        icon_path = "assets/icons/app_icon.png"
         try:
-            # Cria um diretório para os recursos se não existir
-            os.makedirs("assets/icons", exist_ok=True)
-            
-            # Cria uma imagem simples para o ícone
-            icon_size = 64
-            icon = Image.new('RGBA', (icon_size, icon_size), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(icon)
-            
-            # Desenha um círculo azul com linhas representando uma rede
-            draw.ellipse((4, 4, icon_size-4, icon_size-4), outline=(0, 120, 215), width=2)
-            draw.line((icon_size//2, 4, icon_size//2, icon_size-4), fill=(0, 120, 215), width=2)
-            draw.line((4, icon_size//2, icon_size-4, icon_size//2), fill=(0, 120, 215), width=2)
-            
-            # Desenha pontos representando dispositivos
-            for x, y in [(16, 16), (48, 16), (16, 48), (48, 48)]:
-                draw.ellipse((x-4, y-4, x+4, y+4), fill=(0, 120, 215))
-            
-            # Salva o ícone
-            icon_path = "assets/icons/app_icon.png"
-            icon.save(icon_path)
-            
-            # Configura o ícone da aplicação
-            icon_image = ImageTk.PhotoImage(icon)
-            self.root.iconphoto(True, icon_image)
-            
+            # Reaproveita o ícone gerado em uma execução anterior
+            icon = Image.open(icon_path)
+            icon.load()
+            return icon
+        except FileNotFoundError:
+            pass
+        
+        # Cria um diretório para os recursos se não existir
+        os.makedirs("assets/icons", exist_ok=True)
+        
+        # Cria uma imagem simples para o ícone
+        icon_size = 64
+        icon = Image.new('RGBA', (icon_size, icon_size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(icon)
+        
+        # Desenha um círculo azul com linhas representando uma rede
+        draw.ellipse((4, 4, icon_size-4, icon_size-4), outline=(0, 120, 215), width=2)
+        draw.line((icon_size//2, 4, icon_size//2, icon_size-4), fill=(0, 120, 215), width=2)
+        draw.line((4, icon_size//2, icon_size-4, icon_size//2), fill=(0, 120, 215), width=2)
+        
+        # Desenha pontos representando dispositivos
+        for x, y in [(16, 16), (48, 16), (16, 48), (48, 48)]:
+            draw.ellipse((x-4, y-4, x+4, y+4), fill=(0, 120, 215))
+        
+        # Salva o ícone
+        icon.save(icon_path)
+        return icon
+    
+    def _build_icon_async(self):
+        """Carrega ou gera o ícone em uma thread separada e o aplica na thread principal."""
+        try:
+            icon = self.create_default_icon()
         except Exception as e:
             print(f"Erro ao criar ícone padrão: {e}")
+            return
+        self.root.after(0, self.set_app_icon, icon)
+    
+    def set_app_icon(self, icon):
+        """
+        Configura o ícone da aplicação.
+        
+        Args:
+            icon: Imagem PIL do ícone
+        """
+        try:
+            # Mantém a referência para evitar a coleta da imagem
+            self._icon_photo = ImageTk.PhotoImage(icon)
+            self.root.iconphoto(True, self._icon_photo)
+        except Exception as e:
+            print(f"Erro ao configurar o ícone: {e}")
     
     def setup_theme(self):
         """Configura o tema da interface."""
@@ -278,7 +493,8 @@ class NetworkScannerGUI:
         columns = ("ip", "hostname", "mac", "status", "os", "ports")
         
         # Treeview (tabela)
-        self.devices_table = ttk.Treeview(table_frame, columns=columns, show="headings", yscrollcommand=scrollbar.set)
+        self.devices_table = ttk.Treeview(table_frame, columns=columns, show="headings", selectmode="browse", yscrollcommand=scrollbar.set)
+        self.devices_table.configure(displaycolumns=columns)
         self.devices_table.pack(fill=tk.BOTH, expand=True)
         
         # Configura a scrollbar
@@ -300,6 +516,11 @@ class NetworkScannerGUI:
         self.devices_table.column("os", width=120, anchor=tk.W)
         self.devices_table.column("ports", width=180, anchor=tk.W)
         
+        # Configura as cores das tags
+        self.devices_table.tag_configure('gateway', background=self.device_colors['gateway'])
+        self.devices_table.tag_configure('local', background=self.device_colors['local'])
+        self.devices_table.tag_configure('online', background=self.device_colors['online'])
+        
         # Configura o evento de seleção
         self.devices_table.bind("<<TreeviewSelect>>", self.on_device_select)
         
@@ -409,7 +630,7 @@ class NetworkScannerGUI:
         vis_control_frame.pack(fill=tk.X, pady=5)
         
         # Botão para atualizar a visualização
-        self.update_vis_button = ttk.Button(vis_control_frame, text="Atualizar Visualização", command=self.update_network_visualization)
+        self.update_vis_button = ttk.Button(vis_control_frame, text="Atualizar Visualização", command=self.schedule_vis_update)
         self.update_vis_button.pack(side=tk.LEFT, padx=5)
         
         # Opções de visualização
@@ -419,7 +640,7 @@ class NetworkScannerGUI:
         vis_type_combo = ttk.Combobox(vis_control_frame, textvariable=self.vis_type_var, state="readonly", width=15)
         vis_type_combo["values"] = ("Radial", "Hierárquica", "Força")
         vis_type_combo.pack(side=tk.LEFT, padx=5)
-        vis_type_combo.bind("<<ComboboxSelected>>", lambda e: self.update_network_visualization())
+        vis_type_combo.bind("<<ComboboxSelected>>", lambda e: self.schedule_vis_update())
         
         # Canvas para a visualização
         self.vis_canvas_frame = ttk.Frame(self.visualization_frame, borderwidth=1, relief=tk.SUNKEN)
@@ -428,12 +649,40 @@ class NetworkScannerGUI:
         self.vis_canvas = tk.Canvas(self.vis_canvas_frame, bg="white")
         self.vis_canvas.pack(fill=tk.BOTH, expand=True)
         
+        # Atualização da visualização agendada (ver schedule_vis_update)
+        self._vis_after = None
+        
+        # Itens já desenhados: chave -> (id, tipo, coordenadas, opções)
+        self._drawn_items = {}
+        self._drawn_vis_type = None
+        self._vis_frame_keys = set()
+        self._heatmap_legend_pos = None
+        
+        # Tipo, versão dos resultados e tamanho do canvas do último desenho
+        self._last_drawn_state = None
+        
+        # Posições relativas dos dispositivos na visualização de força
+        self._force_positions = {}
+        self._force_random = random.Random(42)  # Para reprodutibilidade
+        self._force_layout_key = None
+        self._layout_executor = None
+        
+        # Fontes dos textos da visualização, criadas uma única vez
+        self._font_title = tkfont.Font(family="Segoe UI", size=12, weight="bold")
+        self._font_message = tkfont.Font(family="Segoe UI", size=12)
+        self._font_gateway = tkfont.Font(family="Segoe UI", size=10, weight="bold")
+        self._font_legend = tkfont.Font(family="Segoe UI", size=9)
+        self._font_label = tkfont.Font(family="Segoe UI", size=8)
+        self._font_label_bold = tkfont.Font(family="Segoe UI", size=8, weight="bold")
+        self._font_small = tkfont.Font(family="Segoe UI", size=7)
+        self._font_small_bold = tkfont.Font(family="Segoe UI", size=7, weight="bold")
+        
         # Mensagem inicial
         self.vis_canvas.create_text(
             self.vis_canvas.winfo_reqwidth() // 2,
             self.vis_canvas.winfo_reqheight() // 2,
             text="Execute uma varredura para visualizar a rede",
-            font=("Segoe UI", 12)
+            font=self._font_message
         )
     
     def create_status_bar(self):
@@ -451,11 +700,25 @@ class NetworkScannerGUI:
         
         # Atualiza a hora a cada segundo
         self.update_clock()
+        self.root.bind("<Map>", self.on_window_map)
     
     def update_clock(self):
         """Atualiza o relógio na barra de status."""
+        # Com a janela minimizada ou oculta o relógio não aparece; apenas
+        # verifica o estado da janela com menos frequência
+        if self.root.state() in ('iconic', 'withdrawn'):
+            self._clock_after = self.root.after(CLOCK_HIDDEN_INTERVAL, self.update_clock)
+            return
+        
         self.status_time.config(text=datetime.now().strftime("%d/%m/%Y %H:%M:%S"))
-        self.root.after(1000, self.update_clock)
+        self._clock_after = self.root.after(1000, self.update_clock)
+    
+    def on_window_map(self, event):
+        """Atualiza o relógio imediatamente quando a janela volta a ser exibida."""
+        if event.widget is not self.root:
+            return
+        self.root.after_cancel(self._clock_after)
+        self.update_clock()
     
     def update_network_info(self):
         """Atualiza as informações da rede na interface."""
@@ -475,12 +738,10 @@ class NetworkScannerGUI:
             return
         
         # Limpa a tabela de dispositivos
-        for item in self.devices_table.get_children():
-            self.devices_table.delete(item)
+        self.clear_devices_table()
         
         # Limpa a tabela de portas
-        for item in self.ports_table.get_children():
-            self.ports_table.delete(item)
+        self.clear_ports_table()
         
         # Limpa os detalhes
         self.clear_device_details()
@@ -490,6 +751,7 @@ class NetworkScannerGUI:
         self.stop_button.config(state=tk.NORMAL)
         self.update_status("Iniciando varredura...")
         self.progress_var.set(0)
+        self._last_progress = 0
         
         # Inicia a varredura em uma thread separada
         self.scan_running = True
@@ -498,34 +760,53 @@ class NetworkScannerGUI:
         self.scan_thread.start()
     
     def run_scan(self):
-        """Executa a varredura da rede em uma thread separada."""
+        """
+        Executa a varredura da rede em uma thread separada.
+        
+        Esta thread só mantém a interface responsiva se o scanner não segurar o
+        GIL enquanto espera a rede: as sondagens devem usar apenas chamadas que
+        o liberam durante o bloqueio (subprocess, socket e asyncio puros, como
+        hoje em network_scanner). Uma futura sondagem ICMP em C (ctypes/cffi/
+        Cython) precisa liberar o GIL em torno de sendto/recvfrom.
+        """
         try:
             # Atualiza a interface
-            self.root.after(0, lambda: self.update_status("Descobrindo dispositivos na rede..."))
+            self.root.after(0, self.update_status, "Descobrindo dispositivos na rede...")
             
             # Executa a varredura
-            if platform.system() == "Windows" and hasattr(self.scanner, 'scan_network_arp'):
-                results = self.scanner.scan_network_arp(self.update_device_callback)
+            if IS_WINDOWS and hasattr(self.scanner, 'scan_network_arp'):
+                results = self.scanner.scan_network_arp(
+                    self.update_device_callback,
+                    progress_callback=self.update_progress_callback
+                )
             else:
-                results = self.scanner.scan_network_ping(self.update_device_callback)
+                # A varredura por ping roda em um laço asyncio próprio desta thread
+                results = asyncio.run(self.scanner.scan_network_async(
+                    self.update_device_callback,
+                    progress_callback=self.update_progress_callback
+                ))
             
             # Atualiza a interface após a conclusão
-            self.root.after(0, lambda: self.update_status(f"Varredura concluída. Encontrados {len(results)} dispositivos."))
-            self.root.after(0, lambda: self.progress_var.set(100))
-            self.root.after(0, lambda: self.update_network_visualization())
+            self.root.after(0, self.update_status, f"Varredura concluída. Encontrados {len(results)} dispositivos.")
+            self.root.after(0, self.progress_var.set, 100)
+            self.root.after(0, self.schedule_vis_update)
             
         except Exception as e:
             # Trata erros
             error_message = f"Erro durante a varredura: {e}"
             print(error_message)
-            self.root.after(0, lambda: self.update_status(error_message))
-            self.root.after(0, lambda: messagebox.showerror("Erro", error_message))
+            self.root.after(0, self.update_status, error_message)
+            self.root.after(0, messagebox.showerror, "Erro", error_message)
         
         finally:
-            # Atualiza a interface
+            # Notifica a interface uma única vez, ao fim da varredura
             self.scan_running = False
-            self.root.after(0, lambda: self.scan_button.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.stop_button.config(state=tk.DISABLED))
+            self.root.after(0, self._scan_finished)
+    
+    def _scan_finished(self):
+        """Atualiza a interface quando a thread de varredura termina."""
+        self.scan_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
     
     def update_device_callback(self, ip, device_data):
         """
@@ -535,8 +816,45 @@ class NetworkScannerGUI:
             ip: Endereço IP do dispositivo
             device_data: Dados do dispositivo
         """
-        # Atualiza a interface na thread principal
-        self.root.after(0, lambda: self.add_device_to_table(ip, device_data))
+        # Enfileira o dispositivo; a inserção na tabela é feita em lote na thread principal
+        self._pending_devices.append((ip, device_data))
+        if not self._device_flush_scheduled:
+            self._device_flush_scheduled = True
+            self.root.after(DEVICE_FLUSH_INTERVAL, self._flush_devices)
+    
+    def update_progress_callback(self, done, total):
+        """
+        Callback para atualizar a barra de progresso com o progresso real da varredura.
+        
+        Args:
+            done: Número de hosts já verificados
+            total: Número total de hosts
+        """
+        # Só agenda a atualização quando a porcentagem muda (no máximo 100 vezes)
+        progress = 100 * done // total if total else 0
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.root.after(0, self.progress_var.set, progress)
+    
+    def _flush_devices(self):
+        """Insere na tabela todos os dispositivos enfileirados desde a última chamada."""
+        self._device_flush_scheduled = False
+        while self._pending_devices:
+            ip, device_data = self._pending_devices.popleft()
+            self.add_device_to_table(ip, device_data)
+    
+    def clear_ports_table(self):
+        """Remove todas as portas da tabela de portas."""
+        clear_treeview(self.ports_table)
+    
+    def clear_devices_table(self):
+        """Remove todos os dispositivos da tabela, junto com os dados exibidos."""
+        clear_treeview(self.devices_table)
+        self._devices.clear()
+        self._sorted_ips.clear()
+        self._pending_devices.clear()
+        self._open_ports_by_ip.clear()
+        self._cached_max_ports = None
     
     def add_device_to_table(self, ip, device_data):
         """
@@ -550,35 +868,48 @@ class NetworkScannerGUI:
         hostname = device_data.get('hostname', 'Desconhecido')
         mac = device_data.get('mac', 'Desconhecido')
         status = device_data.get('status', 'Desconhecido')
-        ports = device_data.get('ports', {})
+        ports = device_data.get('ports', EMPTY_PORTS)
         os_info = device_data.get('os', {'name': 'Desconhecido', 'confidence': 0})
         os_name = os_info.get('name', 'Desconhecido')
         
         # Formata a lista de portas
-        ports_str = ', '.join([f"{port}" for port in ports.keys()]) if ports else 'Nenhuma'
+        ports_str = ', '.join(map(str, ports)) if ports else 'Nenhuma'
         
-        # Verifica se o dispositivo já está na tabela
-        for item in self.devices_table.get_children():
-            if self.devices_table.item(item, 'values')[0] == ip:
-                # Atualiza o item existente
-                self.devices_table.item(item, values=(ip, hostname, mac, status, os_name, ports_str))
-                return
+        # As portas do dispositivo mudaram; o máximo usado na visualização é recalculado
+        self._open_ports_by_ip.setdefault(ip, set()).update(ports)
+        self._cached_max_ports = None
         
-        # Adiciona o dispositivo à tabela
-        item_id = self.devices_table.insert('', 'end', values=(ip, hostname, mac, status, os_name, ports_str))
+        # Guarda os dados fora da tabela; os valores da tabela são apenas exibição
+        is_new = ip not in self._devices
+        self._devices[ip] = DeviceRecord(
+            ip, str(hostname), str(mac), str(status), str(os_name),
+            os_info.get('confidence', 0) if 'os' in device_data else None, ports
+        )
+        
+        # Verifica se o dispositivo já está na tabela
+        if not is_new:
+            # Atualiza o item existente
+            self.devices_table.item(ip, values=(ip, hostname, mac, status, os_name, ports_str))
+            return
         
         # Define a cor de fundo com base no tipo de dispositivo
         if ip == self.scanner.gateway:
-            self.devices_table.item(item_id, tags=('gateway',))
+            tag = 'gateway'
         elif ip == self.scanner.local_ip:
-            self.devices_table.item(item_id, tags=('local',))
+            tag = 'local'
         else:
-            self.devices_table.item(item_id, tags=('online',))
+            tag = 'online'
         
-        # Configura as cores das tags
-        self.devices_table.tag_configure('gateway', background=self.device_colors['gateway'])
-        self.devices_table.tag_configure('local', background=self.device_colors['local'])
-        self.devices_table.tag_configure('online', background=self.device_colors['online'])
+        # Posição do dispositivo na tabela, em ordem crescente de IP
+        try:
+            ip_key = int(ipaddress.ip_address(ip))
+        except ValueError:
+            ip_key = float('inf')
+        index = bisect_left(self._sorted_ips, ip_key)
+        self._sorted_ips.insert(index, ip_key)
+        
+        # Adiciona o dispositivo à tabela
+        self.devices_table.insert('', index, iid=ip, values=(ip, hostname, mac, status, os_name, ports_str), tags=(tag,))
     
     def stop_scan(self):
         """Interrompe a varredura em andamento."""
@@ -590,10 +921,25 @@ class NetworkScannerGUI:
         
         # Atualiza a interface
         self.update_status("Interrompendo varredura...")
+        self.stop_button.config(state=tk.DISABLED)
         
-        # Aguarda a conclusão da thread
-        if self.scan_thread and self.scan_thread.is_alive():
-            self.scan_thread.join(2.0)  # Aguarda até 2 segundos
+        # Aguarda a conclusão da thread sem bloquear a interface
+        self._poll_stop(self.scan_thread)
+    
+    def _poll_stop(self, thread):
+        """
+        Verifica periodicamente se a thread de varredura terminou após a interrupção.
+        
+        Args:
+            thread: Thread da varredura interrompida
+        """
+        if thread and thread.is_alive():
+            self.root.after(STOP_POLL_INTERVAL, self._poll_stop, thread)
+            return
+        
+        # Uma nova varredura já foi iniciada; não altera a interface
+        if thread is not self.scan_thread:
+            return
         
         # Atualiza a interface
         self.scan_running = False
@@ -608,50 +954,41 @@ class NetworkScannerGUI:
         if not selection:
             return
         
-        # Obtém os dados do dispositivo selecionado
-        item = selection[0]
-        values = self.devices_table.item(item, 'values')
-        
-        # Extrai os valores
-        ip = values[0]
-        hostname = values[1]
-        mac = values[2]
-        status = values[3]
+        # Obtém os dados do dispositivo selecionado (o identificador da linha é o IP)
+        ip = selection[0]
+        device = self._devices.get(ip)
+        if device is None:
+            return
         
         # Armazena o dispositivo selecionado
         self.selected_device = ip
         
         # Atualiza os detalhes
         self.detail_ip_label.config(text=ip)
-        self.detail_hostname_label.config(text=hostname)
-        self.detail_mac_label.config(text=mac)
-        self.detail_status_label.config(text=status)
+        self.detail_hostname_label.config(text=device.hostname)
+        self.detail_mac_label.config(text=device.mac)
+        self.detail_status_label.config(text=device.status)
         
         # Atualiza informação do sistema operacional
-        if ip in self.scanner.scan_results and 'os' in self.scanner.scan_results[ip]:
-            os_info = self.scanner.scan_results[ip]['os']
-            os_name = os_info.get('name', 'Desconhecido')
-            os_confidence = os_info.get('confidence', 0)
-            
-            # Atualiza o rótulo existente
-            self.detail_os_label.config(text=f"{os_name} ({os_confidence:.0f}% confiança)")
+        if device.os_confidence is not None:
+            self.detail_os_label.config(text=f"{device.os_name} ({device.os_confidence:.0f}% confiança)")
         else:
             # Se não houver informação de SO, mostra "Desconhecido"
             self.detail_os_label.config(text="Desconhecido")
         
         # Limpa a tabela de portas
-        for item in self.ports_table.get_children():
-            self.ports_table.delete(item)
+        self.clear_ports_table()
         
         # Adiciona as portas à tabela
-        if ip in self.scanner.scan_results:
-            ports = self.scanner.scan_results[ip].get('ports', {})
-            for port, service in ports.items():
-                # Descrição do serviço
-                description = self.get_service_description(service)
-                
-                # Adiciona à tabela
-                self.ports_table.insert('', 'end', values=(port, service, description))
+        if device.ports:
+            # Monta todas as linhas antes de inseri-las
+            rows = [(port, service, self.get_service_description(service)) for port, service in device.ports.items()]
+            
+            # Insere as linhas diretamente pelo interpretador Tcl
+            table_path = str(self.ports_table)
+            call = self.ports_table.tk.call
+            for row in rows:
+                call(table_path, 'insert', '', 'end', '-values', row)
     
     def clear_device_details(self):
         """Limpa os detalhes do dispositivo."""
@@ -661,8 +998,7 @@ class NetworkScannerGUI:
         self.detail_status_label.config(text="-")
         
         # Limpa a tabela de portas
-        for item in self.ports_table.get_children():
-            self.ports_table.delete(item)
+        self.clear_ports_table()
         
         # Limpa o dispositivo selecionado
         self.selected_device = None
@@ -674,7 +1010,7 @@ class NetworkScannerGUI:
             return
         
         # Verifica se já existe uma varredura em andamento para este dispositivo
-        if self.selected_device in self.port_scan_threads and self.port_scan_threads[self.selected_device].is_alive():
+        if self.selected_device in self._port_scans:
             messagebox.showinfo("Varredura em Andamento", f"Uma varredura de portas já está em andamento para {self.selected_device}.")
             return
         
@@ -684,34 +1020,66 @@ class NetworkScannerGUI:
             end_port = int(self.port_end_var.get())
             
             # Valida o intervalo
-            if start_port < 1 or start_port > 65535 or end_port < 1 or end_port > 65535 or start_port > end_port:
+            if not 1 <= start_port <= end_port <= 65535:
                 messagebox.showerror("Intervalo Inválido", "O intervalo de portas deve estar entre 1 e 65535, e o início deve ser menor que o fim.")
                 return
             
+            # Confirma intervalos muito grandes antes de iniciar a varredura
+            if end_port - start_port + 1 > LARGE_PORT_RANGE:
+                if not messagebox.askyesno(
+                    "Intervalo Grande",
+                    f"Serão verificadas {end_port - start_port + 1} portas, o que pode levar algum tempo. Deseja continuar?"
+                ):
+                    return
+            
             # Atualiza a interface
             self.update_status(f"Verificando portas em {self.selected_device}...")
             
             # Limpa a tabela de portas
-            for item in self.ports_table.get_children():
-                self.ports_table.delete(item)
-            
-            # Inicia a varredura em uma thread separada
-            thread = threading.Thread(
-                target=self.run_port_scan,
-                args=(self.selected_device, (start_port, end_port))
+            self.clear_ports_table()
+            
+            # Envia a varredura para o laço asyncio de portas; o Future
+            # retornado permite cancelá-la a partir da thread da interface
+            self._start_port_scan_loop()
+            ip = self.selected_device
+            future = asyncio.run_coroutine_threadsafe(
+                self.run_port_scan(ip, (start_port, end_port)), self._port_loop
             )
-            thread.daemon = True
-            thread.start()
-            
-            # Armazena a thread
-            self.port_scan_threads[self.selected_device] = thread
+            self._port_scans[ip] = future
+            future.add_done_callback(lambda f: self.root.after(0, self._port_scan_done, ip, f))
             
         except ValueError:
             messagebox.showerror("Erro", "Os valores de porta devem ser números inteiros.")
     
-    def run_port_scan(self, ip, port_range):
+    def _start_port_scan_loop(self):
+        """Inicia, na primeira utilização, a thread com o laço asyncio das varreduras de portas."""
+        if self._port_loop is not None:
+            return
+        
+        self._port_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=self._port_loop.run_forever)
+        thread.daemon = True
+        thread.start()
+    
+    def _port_scan_done(self, ip, future):
+        """
+        Remove a varredura de portas concluída (ou cancelada) da lista de varreduras ativas.
+        
+        Args:
+            ip: Endereço IP do dispositivo
+            future: Future da varredura concluída
+        """
+        if self._port_scans.get(ip) is future:
+            del self._port_scans[ip]
+    
+    def cancel_port_scans(self):
+        """Cancela todas as varreduras de portas em andamento."""
+        for future in list(self._port_scans.values()):
+            future.cancel()
+    
+    async def run_port_scan(self, ip, port_range):
         """
-        Executa a varredura de portas em uma thread separada.
+        Executa a varredura de portas no laço asyncio de portas.
         
         Args:
             ip: Endereço IP do dispositivo
@@ -719,22 +1087,22 @@ class NetworkScannerGUI:
         """
         try:
             # Executa a varredura
-            self.scanner.scan_ports(ip, port_range, self.update_port_callback)
+            await self.scanner.scan_ports_async(ip, port_range, self.update_port_callback)
             
             # Atualiza a interface após a conclusão
-            self.root.after(0, lambda: self.update_status(f"Varredura de portas concluída para {ip}."))
+            self.root.after(0, self.update_status, f"Varredura de portas concluída para {ip}.")
             
             # Atualiza a tabela de dispositivos
             if ip in self.scanner.scan_results:
                 device_data = self.scanner.scan_results[ip]
-                self.root.after(0, lambda: self.add_device_to_table(ip, device_data))
+                self.root.after(0, self.add_device_to_table, ip, device_data)
             
         except Exception as e:
             # Trata erros
             error_message = f"Erro durante a varredura de portas: {e}"
             print(error_message)
-            self.root.after(0, lambda: self.update_status(error_message))
-            self.root.after(0, lambda: messagebox.showerror("Erro", error_message))
+            self.root.after(0, self.update_status, error_message)
+            self.root.after(0, messagebox.showerror, "Erro", error_message)
     
     def update_port_callback(self, ip, port, service):
         """
@@ -745,29 +1113,34 @@ class NetworkScannerGUI:
             port: Número da porta
             service: Nome do serviço
         """
-        # Atualiza a interface na thread principal
-        self.root.after(0, lambda: self.add_port_to_table(ip, port, service))
+        # Enfileira a porta; a inserção na tabela é feita em lote na thread principal
+        self._pending_ports.append((ip, port, service))
+        if not self._port_flush_scheduled:
+            self._port_flush_scheduled = True
+            self.root.after(PORT_FLUSH_INTERVAL, self._flush_ports)
     
-    def add_port_to_table(self, ip, port, service):
-        """
-        Adiciona uma porta à tabela de portas.
-        
-        Args:
-            ip: Endereço IP do dispositivo
-            port: Número da porta
-            service: Nome do serviço
-        """
-        # Verifica se o dispositivo selecionado ainda é o mesmo
-        if self.selected_device != ip:
-            return
-        
-        # Descrição do serviço
-        description = self.get_service_description(service)
-        
-        # Adiciona à tabela
-        self.ports_table.insert('', 'end', values=(port, service, description))
+    def _flush_ports(self):
+        """Insere na tabela todas as portas enfileiradas desde a última chamada."""
+        self._port_flush_scheduled = False
+        self._cached_max_ports = None
+        
+        # Monta as linhas do dispositivo selecionado antes de inseri-las
+        rows = []
+        while self._pending_ports:
+            ip, port, service = self._pending_ports.popleft()
+            self._open_ports_by_ip.setdefault(ip, set()).add(port)
+            if ip == self.selected_device:
+                rows.append((port, service, self.get_service_description(service)))
+        
+        # Insere as linhas diretamente pelo interpretador Tcl
+        table_path = str(self.ports_table)
+        call = self.ports_table.tk.call
+        for row in rows:
+            call(table_path, 'insert', '', 'end', '-values', row)
     
-    def get_service_description(self, service):
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_service_description(service):
         """
         Obtém a descrição de um serviço.
         
@@ -777,40 +1150,7 @@ class NetworkScannerGUI:
         Returns:
             str: Descrição do serviço
         """
-        # Descrições comuns de serviços
-        descriptions = {
-            'http': 'Servidor Web (HTTP)',
-            'https': 'Servidor Web Seguro (HTTPS)',
-            'ftp': 'Servidor de Transferência de Arquivos (FTP)',
-            'ssh': 'Acesso Remoto Seguro (SSH)',
-            'telnet': 'Acesso Remoto (Telnet)',
-            'smtp': 'Servidor de E-mail (SMTP)',
-            'pop3': 'Recebimento de E-mail (POP3)',
-            'imap': 'Acesso a E-mail (IMAP)',
-            'dns': 'Servidor de Nomes (DNS)',
-            'dhcp': 'Configuração Automática de Rede (DHCP)',
-            'rdp': 'Área de Trabalho Remota (RDP)',
-            'vnc': 'Controle Remoto (VNC)',
-            'mysql': 'Banco de Dados MySQL',
-            'mssql': 'Banco de Dados Microsoft SQL Server',
-            'smb': 'Compartilhamento de Arquivos Windows (SMB)',
-            'netbios': 'Serviço de Rede Windows (NetBIOS)',
-            'snmp': 'Gerenciamento de Rede (SNMP)',
-            'ldap': 'Diretório de Rede (LDAP)',
-            'ntp': 'Sincronização de Tempo (NTP)',
-            'irc': 'Chat (IRC)',
-            'pptp': 'VPN Point-to-Point (PPTP)',
-            'l2tp': 'VPN Layer 2 (L2TP)',
-            'openvpn': 'VPN OpenVPN',
-            'ipsec': 'VPN IPsec',
-            'sip': 'Telefonia IP (SIP)',
-            'rtsp': 'Streaming de Mídia (RTSP)',
-            'http-proxy': 'Proxy HTTP',
-            'socks': 'Proxy SOCKS',
-            'unknown': 'Serviço Desconhecido'
-        }
-        
-        return descriptions.get(service.lower(), 'Serviço não identificado')
+        return SERVICE_DESCRIPTIONS.get(service.lower(), 'Serviço não identificado')
     
     def copy_to_clipboard(self, field):
         """
@@ -848,7 +1188,7 @@ class NetworkScannerGUI:
         # Verifica se o dispositivo tem a porta 80 (HTTP) ou 443 (HTTPS) aberta
         ip = self.selected_device
         if ip in self.scanner.scan_results:
-            ports = self.scanner.scan_results[ip].get('ports', {})
+            ports = self._open_ports_by_ip.get(ip, ())
             
             # Determina o protocolo
             if 443 in ports:
@@ -955,6 +1295,13 @@ class NetworkScannerGUI:
                 messagebox.showinfo("Sem Histórico", "Não há varreduras anteriores para carregar.")
                 return
             
+            # Reaproveita a janela já criada, atualizando apenas a lista
+            if self._load_window is not None and self._load_window.winfo_exists():
+                clear_treeview(self._load_list)
+                self.populate_history_list(self._load_list, history)
+                self.show_dialog(self._load_window)
+                return
+            
             # Cria uma janela para selecionar a varredura
             select_window = tk.Toplevel(self.root)
             select_window.title("Carregar Varredura Anterior")
@@ -962,45 +1309,13 @@ class NetworkScannerGUI:
             select_window.minsize(600, 400)
             select_window.transient(self.root)
             select_window.grab_set()
+            select_window.protocol("WM_DELETE_WINDOW", lambda: self.hide_dialog(select_window))
             
-            # Frame para a lista
-            list_frame = ttk.Frame(select_window, padding=10)
-            list_frame.pack(fill=tk.BOTH, expand=True)
-            
-            # Scrollbar
-            scrollbar = ttk.Scrollbar(list_frame)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            # Colunas da lista
-            columns = ("timestamp", "network", "devices", "ports")
-            
-            # Lista de varreduras
-            history_list = ttk.Treeview(list_frame, columns=columns, show="headings", yscrollcommand=scrollbar.set)
-            history_list.pack(fill=tk.BOTH, expand=True)
-            
-            # Configura a scrollbar
-            scrollbar.config(command=history_list.yview)
-            
-            # Configura as colunas
-            history_list.heading("timestamp", text="Data/Hora")
-            history_list.heading("network", text="Rede")
-            history_list.heading("devices", text="Dispositivos")
-            history_list.heading("ports", text="Portas Abertas")
-            
-            # Configura a largura das colunas
-            history_list.column("timestamp", width=150, anchor=tk.W)
-            history_list.column("network", width=120, anchor=tk.W)
-            history_list.column("devices", width=100, anchor=tk.CENTER)
-            history_list.column("ports", width=100, anchor=tk.CENTER)
+            # Lista de varreduras (o nome do arquivo fica em uma coluna oculta)
+            history_list = self.create_history_list(select_window, show_filename=False)
             
             # Adiciona os itens à lista
-            for item in history:
-                history_list.insert('', 'end', values=(
-                    item['timestamp'],
-                    item['network'],
-                    item['total_devices'],
-                    item['total_open_ports']
-                ), tags=(item['filename'],))
+            self.populate_history_list(history_list, history)
             
             # Frame para botões
             button_frame = ttk.Frame(select_window, padding=10)
@@ -1011,12 +1326,103 @@ class NetworkScannerGUI:
             load_button.pack(side=tk.RIGHT, padx=5)
             
             # Botão para cancelar
-            cancel_button = ttk.Button(button_frame, text="Cancelar", command=select_window.destroy)
+            cancel_button = ttk.Button(button_frame, text="Cancelar", command=lambda: self.hide_dialog(select_window))
             cancel_button.pack(side=tk.RIGHT, padx=5)
             
+            # Guarda a janela para as próximas aberturas
+            self._load_window = select_window
+            self._load_list = history_list
+            
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar o histórico de varreduras: {e}")
     
+    def show_dialog(self, window):
+        """
+        Exibe novamente uma janela de diálogo ocultada.
+        
+        Args:
+            window: Janela a ser exibida
+        """
+        window.deiconify()
+        window.lift()
+        window.grab_set()
+    
+    def hide_dialog(self, window):
+        """
+        Oculta uma janela de diálogo, mantendo-a para ser reaproveitada.
+        
+        Args:
+            window: Janela a ser ocultada
+        """
+        window.grab_release()
+        window.withdraw()
+    
+    def create_history_list(self, parent, show_filename=True):
+        """
+        Cria a lista de varreduras usada nas janelas de histórico.
+        
+        Args:
+            parent: Janela onde a lista será criada
+            show_filename: Se a coluna com o nome do arquivo deve ser exibida
+            
+        Returns:
+            ttk.Treeview: Lista de varreduras
+        """
+        # Frame para a lista
+        list_frame = ttk.Frame(parent, padding=10)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Scrollbar
+        scrollbar = ttk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Lista de varreduras
+        columns = tuple(column[0] for column in HISTORY_COLUMNS)
+        history_list = ttk.Treeview(list_frame, columns=columns, show="headings", yscrollcommand=scrollbar.set)
+        if not show_filename:
+            history_list.configure(displaycolumns=columns[:-1])
+        history_list.pack(fill=tk.BOTH, expand=True)
+        
+        # Configura a scrollbar
+        scrollbar.config(command=history_list.yview)
+        
+        # Configura o título, a largura e o alinhamento das colunas
+        for column_id, text, width, anchor in HISTORY_COLUMNS:
+            history_list.heading(column_id, text=text)
+            history_list.column(column_id, width=width, anchor=anchor)
+        
+        return history_list
+    
+    def populate_history_list(self, history_list, history):
+        """
+        Preenche uma lista de histórico em blocos, sem bloquear a interface
+        quando há muitas varreduras salvas.
+        
+        Args:
+            history_list: Lista de varreduras (Treeview)
+            history: Lista de varreduras retornada pelo gerenciador de dados
+        """
+        # Monta todas as linhas antes de inseri-las
+        rows = [
+            (item['timestamp'], item['network'], item['total_devices'], item['total_open_ports'], item['filename'])
+            for item in history
+        ]
+        
+        # Um novo preenchimento da mesma lista interrompe o anterior
+        list_path = str(history_list)
+        self._history_fills[list_path] = rows
+        
+        def insert_chunk(start):
+            # A janela pode ter sido fechada antes do fim do preenchimento
+            if self._history_fills.get(list_path) is not rows or not history_list.winfo_exists():
+                return
+            for row in rows[start:start + HISTORY_CHUNK_SIZE]:
+                history_list.insert('', 'end', values=row)
+            if start + HISTORY_CHUNK_SIZE < len(rows):
+                self.root.after(0, insert_chunk, start + HISTORY_CHUNK_SIZE)
+        
+        insert_chunk(0)
+    
     def do_load_scan(self, history_list, window):
         """
         Carrega a varredura selecionada.
@@ -1031,12 +1437,12 @@ class NetworkScannerGUI:
             messagebox.showinfo("Nenhuma Varredura Selecionada", "Selecione uma varredura para carregar.")
             return
         
-        # Obtém o nome do arquivo
+        # Obtém o nome do arquivo (última coluna)
         item = selection[0]
-        filename = history_list.item(item, 'tags')[0]
+        filename = history_list.item(item, 'values')[-1]
         
-        # Fecha a janela
-        window.destroy()
+        # Oculta a janela
+        self.hide_dialog(window)
         
         try:
             # Carrega os dados
@@ -1046,39 +1452,48 @@ class NetworkScannerGUI:
                 messagebox.showerror("Erro", "Erro ao carregar os dados da varredura.")
                 return
             
-            # Limpa a tabela de dispositivos
-            for item in self.devices_table.get_children():
-                self.devices_table.delete(item)
-            
-            # Limpa a tabela de portas
-            for item in self.ports_table.get_children():
-                self.ports_table.delete(item)
-            
-            # Limpa os detalhes
-            self.clear_device_details()
-            
-            # Atualiza as informações da rede
-            self.scanner.local_ip = scan_data.get('local_ip', self.scanner.local_ip)
-            self.scanner.gateway = scan_data.get('gateway', self.scanner.gateway)
-            self.scanner.network = scan_data.get('network', self.scanner.network)
-            self.update_network_info()
-            
-            # Atualiza os resultados da varredura
-            self.scanner.scan_results = scan_data.get('devices', {})
-            
-            # Adiciona os dispositivos à tabela
-            for ip, device_data in self.scanner.scan_results.items():
-                self.add_device_to_table(ip, device_data)
-            
-            # Atualiza a visualização da rede
-            self.update_network_visualization()
-            
-            # Atualiza o status
-            self.update_status(f"Varredura carregada: {scan_data.get('timestamp', 'Desconhecido')}")
+            self.apply_loaded_scan(scan_data)
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar a varredura: {e}")
     
+    def apply_loaded_scan(self, scan_data):
+        """
+        Substitui os resultados exibidos pelos de uma varredura carregada do histórico.
+        
+        Args:
+            scan_data: Dados da varredura carregada
+        """
+        # Limpa a tabela de dispositivos
+        self.clear_devices_table()
+        
+        # Limpa a tabela de portas
+        self.clear_ports_table()
+        
+        # Limpa os detalhes
+        self.clear_device_details()
+        
+        # Atualiza as informações da rede
+        self.scanner.local_ip = scan_data.get('local_ip', self.scanner.local_ip)
+        self.scanner.gateway = scan_data.get('gateway', self.scanner.gateway)
+        self.scanner.network = scan_data.get('network', self.scanner.network)
+        self.update_network_info()
+        
+        # Atualiza os resultados da varredura
+        self.scanner.scan_results = scan_data.get('devices', {})
+        self.scanner.touch_results()
+        
+        # Adiciona os dispositivos à tabela
+        for ip, device_data in self.scanner.scan_results.items():
+            self.add_device_to_table(ip, device_data)
+        
+        # Agenda uma única atualização da visualização, após todas as inserções;
+        # a inserção de dispositivos na tabela não redesenha a visualização
+        self.schedule_vis_update()
+        
+        # Atualiza o status
+        self.update_status(f"Varredura carregada: {scan_data.get('timestamp', 'Desconhecido')}")
+    
     def manage_history(self):
         """Gerencia o histórico de varreduras."""
         try:
@@ -1089,6 +1504,13 @@ class NetworkScannerGUI:
                 messagebox.showinfo("Sem Histórico", "Não há varreduras anteriores para gerenciar.")
                 return
             
+            # Reaproveita a janela já criada, atualizando apenas a lista
+            if self._manage_window is not None and self._manage_window.winfo_exists():
+                clear_treeview(self._manage_list)
+                self.populate_history_list(self._manage_list, history)
+                self.show_dialog(self._manage_window)
+                return
+            
             # Cria uma janela para gerenciar o histórico
             manage_window = tk.Toplevel(self.root)
             manage_window.title("Gerenciar Histórico de Varreduras")
@@ -1096,48 +1518,13 @@ class NetworkScannerGUI:
             manage_window.minsize(700, 500)
             manage_window.transient(self.root)
             manage_window.grab_set()
-            
-            # Frame para a lista
-            list_frame = ttk.Frame(manage_window, padding=10)
-            list_frame.pack(fill=tk.BOTH, expand=True)
-            
-            # Scrollbar
-            scrollbar = ttk.Scrollbar(list_frame)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            # Colunas da lista
-            columns = ("timestamp", "network", "devices", "ports", "filename")
+            manage_window.protocol("WM_DELETE_WINDOW", lambda: self.hide_dialog(manage_window))
             
             # Lista de varreduras
-            history_list = ttk.Treeview(list_frame, columns=columns, show="headings", yscrollcommand=scrollbar.set)
-            history_list.pack(fill=tk.BOTH, expand=True)
-            
-            # Configura a scrollbar
-            scrollbar.config(command=history_list.yview)
-            
-            # Configura as colunas
-            history_list.heading("timestamp", text="Data/Hora")
-            history_list.heading("network", text="Rede")
-            history_list.heading("devices", text="Dispositivos")
-            history_list.heading("ports", text="Portas Abertas")
-            history_list.heading("filename", text="Arquivo")
-            
-            # Configura a largura das colunas
-            history_list.column("timestamp", width=150, anchor=tk.W)
-            history_list.column("network", width=120, anchor=tk.W)
-            history_list.column("devices", width=100, anchor=tk.CENTER)
-            history_list.column("ports", width=100, anchor=tk.CENTER)
-            history_list.column("filename", width=200, anchor=tk.W)
+            history_list = self.create_history_list(manage_window)
             
             # Adiciona os itens à lista
-            for item in history:
-                history_list.insert('', 'end', values=(
-                    item['timestamp'],
-                    item['network'],
-                    item['total_devices'],
-                    item['total_open_ports'],
-                    item['filename']
-                ))
+            self.populate_history_list(history_list, history)
             
             # Frame para botões
             button_frame = ttk.Frame(manage_window, padding=10)
@@ -1156,9 +1543,13 @@ class NetworkScannerGUI:
             export_button.pack(side=tk.LEFT, padx=5)
             
             # Botão para fechar
-            close_button = ttk.Button(button_frame, text="Fechar", command=manage_window.destroy)
+            close_button = ttk.Button(button_frame, text="Fechar", command=lambda: self.hide_dialog(manage_window))
             close_button.pack(side=tk.RIGHT, padx=5)
             
+            # Guarda a janela para as próximas aberturas
+            self._manage_window = manage_window
+            self._manage_list = history_list
+            
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerenciar o histórico de varreduras: {e}")
     
@@ -1170,60 +1561,7 @@ class NetworkScannerGUI:
             history_list: Lista de varreduras
             window: Janela de gerenciamento
         """
-        # Obtém o item selecionado
-        selection = history_list.selection()
-        if not selection:
-            messagebox.showinfo("Nenhuma Varredura Selecionada", "Selecione uma varredura para carregar.")
-            return
-        
-        # Obtém o nome do arquivo
-        item = selection[0]
-        values = history_list.item(item, 'values')
-        filename = values[4]
-        
-        # Fecha a janela
-        window.destroy()
-        
-        try:
-            # Carrega os dados
-            scan_data = self.data_manager.load_scan_results(filename)
-            
-            if not scan_data:
-                messagebox.showerror("Erro", "Erro ao carregar os dados da varredura.")
-                return
-            
-            # Limpa a tabela de dispositivos
-            for item in self.devices_table.get_children():
-                self.devices_table.delete(item)
-            
-            # Limpa a tabela de portas
-            for item in self.ports_table.get_children():
-                self.ports_table.delete(item)
-            
-            # Limpa os detalhes
-            self.clear_device_details()
-            
-            # Atualiza as informações da rede
-            self.scanner.local_ip = scan_data.get('local_ip', self.scanner.local_ip)
-            self.scanner.gateway = scan_data.get('gateway', self.scanner.gateway)
-            self.scanner.network = scan_data.get('network', self.scanner.network)
-            self.update_network_info()
-            
-            # Atualiza os resultados da varredura
-            self.scanner.scan_results = scan_data.get('devices', {})
-            
-            # Adiciona os dispositivos à tabela
-            for ip, device_data in self.scanner.scan_results.items():
-                self.add_device_to_table(ip, device_data)
-            
-            # Atualiza a visualização da rede
-            self.update_network_visualization()
-            
-            # Atualiza o status
-            self.update_status(f"Varredura carregada: {scan_data.get('timestamp', 'Desconhecido')}")
-            
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao carregar a varredura: {e}")
+        self.do_load_scan(history_list, window)
     
     def delete_scan(self, history_list):
         """
@@ -1353,10 +1691,77 @@ class NetworkScannerGUI:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao limpar o histórico: {e}")
     
+    def heat_tables(self, max_ports, min_radius, max_radius):
+        """
+        Pré-calcula as cores e os raios do mapa de calor para cada número de portas
+        de 0 a max_ports, evitando o cálculo por dispositivo.
+        
+        Args:
+            max_ports: Número máximo de portas abertas
+            min_radius: Raio para nenhuma porta aberta
+            max_radius: Raio para max_ports portas abertas
+            
+        Returns:
+            tuple: (lista de cores, lista de raios), indexadas pelo número de portas
+        """
+        # As cores vêm da tabela pré-calculada de heatmap_utils
+        colors = [get_heat_color(count, 0, max_ports) for count in range(max_ports + 1)]
+        radii = [get_heat_radius(count, 0, max_ports, min_radius, max_radius) for count in range(max_ports + 1)]
+        return colors, radii
+    
+    def get_max_open_ports(self):
+        """
+        Obtém o maior número de portas abertas entre os dispositivos, mantido em cache
+        até que a tabela de dispositivos ou de portas seja alterada.
+        
+        Returns:
+            int: Número máximo de portas abertas (no mínimo 1, evitando divisão por zero)
+        """
+        if self._cached_max_ports is None:
+            self._cached_max_ports = max(map(len, self._open_ports_by_ip.values()), default=1) or 1
+        return self._cached_max_ports
+    
+    def schedule_vis_update(self):
+        """
+        Agenda a atualização da visualização, agrupando pedidos feitos em sequência.
+        
+        Pedidos feitos enquanto uma atualização já está agendada são descartados,
+        de modo que pedidos contínuos não adiam o desenho indefinidamente.
+        """
+        if self._vis_after is None:
+            self._vis_after = self.root.after(VIS_UPDATE_DELAY, self._run_vis_update)
+    
+    def _run_vis_update(self):
+        """Executa a atualização da visualização agendada."""
+        self._vis_after = None
+        self.update_network_visualization()
+    
     def update_network_visualization(self):
         """Atualiza a visualização gráfica da rede."""
-        # Limpa o canvas
-        self.vis_canvas.delete("all")
+        # Obtém o tipo de visualização
+        vis_type = self.vis_type_var.get().lower()
+        
+        # Nada mudou desde o último desenho (tipo, resultados, escala do mapa de
+        # calor e tamanho do canvas): mantém o canvas como está
+        state = (
+            vis_type,
+            self.scanner.results_version,
+            self.get_max_open_ports(),
+            self.vis_canvas.winfo_width(),
+            self.vis_canvas.winfo_height()
+        )
+        if state == self._last_drawn_state:
+            return
+        self._last_drawn_state = state
+        
+        # As visualizações são atualizadas de forma incremental; ao trocar de
+        # tipo, o canvas é limpo e redesenhado
+        if vis_type != self._drawn_vis_type or not self.scanner.scan_results:
+            self.vis_canvas.delete("all")
+            self._drawn_items = {}
+            self._heatmap_legend_pos = None
+        self._drawn_vis_type = vis_type
+        self._vis_frame_keys = set()
         
         # Verifica se há resultados para visualizar
         if not self.scanner.scan_results:
@@ -1364,23 +1769,114 @@ class NetworkScannerGUI:
                 self.vis_canvas.winfo_width() // 2,
                 self.vis_canvas.winfo_height() // 2,
                 text="Execute uma varredura para visualizar a rede",
-                font=("Segoe UI", 12)
+                font=self._font_message
             )
+            # Força a limpeza do canvas (e desta mensagem) no próximo desenho
+            self._drawn_vis_type = None
             return
         
-        # Obtém o tipo de visualização
-        vis_type = self.vis_type_var.get().lower()
+        # Copia os resultados uma única vez: as threads de varredura continuam
+        # alterando o dicionário enquanto a visualização é desenhada
+        results = dict(self.scanner.scan_results)
         
         # Desenha a visualização
         if vis_type == "radial":
-            self.draw_radial_visualization()
+            self.draw_radial_visualization(results)
         elif vis_type == "hierárquica":
-            self.draw_hierarchical_visualization()
+            self.draw_hierarchical_visualization(results)
         else:  # força
-            self.draw_force_visualization()
+            self.draw_force_visualization(results)
+        
+        # Remove os itens de dispositivos que não foram desenhados nesta atualização
+        for key in self._drawn_items.keys() - self._vis_frame_keys:
+            self.vis_canvas.delete(self._drawn_items.pop(key)[0])
+    
+    def _draw_vis_item(self, key, kind, coords, **options):
+        """
+        Cria ou atualiza um item do canvas de visualização.
+        
+        Itens já desenhados com a mesma chave são reaproveitados: apenas as
+        coordenadas e as opções que mudaram são enviadas ao Tk.
+        
+        Args:
+            key: Chave estável do item (ex: ("node", ip))
+            kind: Tipo do item no canvas ('oval', 'line', 'text', 'rectangle')
+            coords: Tupla com as coordenadas do item
+            **options: Opções do item (fill, text, tags, ...)
+            
+        Returns:
+            int: Identificador do item no canvas
+        """
+        self._vis_frame_keys.add(key)
+        drawn = self._drawn_items.get(key)
+        
+        if drawn and drawn[1] == kind:
+            item_id, _, last_coords, last_options = drawn
+            if last_coords != coords:
+                self.vis_canvas.coords(item_id, *coords)
+            if last_options != options:
+                self.vis_canvas.itemconfigure(item_id, **options)
+        else:
+            if drawn:
+                self.vis_canvas.delete(drawn[0])
+            item_id = getattr(self.vis_canvas, f"create_{kind}")(*coords, **options)
+        
+        self._drawn_items[key] = (item_id, kind, coords, options)
+        return item_id
+    
+    def _draw_spokes(self, center, ends, **options):
+        """
+        Desenha as linhas que ligam o gateway aos dispositivos como um único item
+        do canvas (centro, ponta, centro, ponta, ...), abaixo dos demais itens.
+        
+        Args:
+            center: Coordenadas (x, y) do gateway
+            ends: Coordenadas (x, y) de cada dispositivo
+            **options: Opções da linha (fill, width, ...)
+        """
+        center_x, center_y = center
+        coords = []
+        for x, y in ends:
+            coords.extend((center_x, center_y, x, y))
+        
+        item_id = self._draw_vis_item(("spokes",), "line", tuple(coords), tags=("line",), **options)
+        self.vis_canvas.tag_lower(item_id)
+    
+    def _draw_vis_legend(self, legend_y, entries):
+        """
+        Desenha a legenda de cores da visualização.
+        
+        Args:
+            legend_y: Posição Y da legenda
+            entries: Tuplas (chave, cor, texto) de cada item, da esquerda para a direita
+        """
+        for i, (key, color, text) in enumerate(entries):
+            x = 30 + i * 170
+            self._draw_vis_item(
+                ("legend", key), "oval",
+                (x, legend_y,
+                 x + 20, legend_y + 20),
+                fill=color,
+                outline="#000000",
+                width=1,
+                tags=("legend")
+            )
+            self._draw_vis_item(
+                ("legend", f"{key}_text"), "text",
+                (x + 70, legend_y + 10),
+                text=text,
+                anchor=tk.W,
+                font=self._font_legend,
+                tags=("legend")
+            )
     
-    def draw_radial_visualization(self):
-        """Desenha a visualização radial da rede."""
+    def draw_radial_visualization(self, results):
+        """
+        Desenha a visualização radial da rede.
+        
+        Args:
+            results: Cópia dos resultados da varredura feita para esta atualização
+        """
         # Obtém as dimensões do canvas
         width = self.vis_canvas.winfo_width()
         height = self.vis_canvas.winfo_height()
@@ -1404,18 +1900,17 @@ class NetworkScannerGUI:
         device_color = "#6495ED"   # Azul
         line_color = "#CCCCCC"     # Cinza claro
         
-        # Encontra o número máximo de portas abertas para escala do mapa de calor
-        max_ports = 1  # Evita divisão por zero
-        for ip, device_data in self.scanner.scan_results.items():
-            num_ports = len(device_data.get('ports', {}))
-            if num_ports > max_ports:
-                max_ports = num_ports
+        # Número máximo de portas abertas para escala do mapa de calor
+        max_ports = self.get_max_open_ports()
+        
+        # Cores e raios dos dispositivos para cada número de portas abertas
+        node_colors, node_radii = self.heat_tables(max_ports, node_radius, node_radius * 1.8)
         
         # Desenha o gateway no centro
         gateway_ip = self.scanner.gateway
-        if gateway_ip and gateway_ip in self.scanner.scan_results:
+        if gateway_ip and gateway_ip in results:
             # Conta portas abertas no gateway
-            gateway_ports = len(self.scanner.scan_results[gateway_ip].get('ports', {}))
+            gateway_ports = len(results[gateway_ip].get('ports', EMPTY_PORTS))
             
             # Determina o raio baseado no número de portas (mapa de calor)
             heat_radius = get_heat_radius(gateway_ports, 0, max_ports, gateway_radius, gateway_radius * 1.5)
@@ -1424,56 +1919,63 @@ class NetworkScannerGUI:
             heat_color = get_heat_color(gateway_ports, 0, max_ports)
             
             # Desenha o círculo do gateway
-            self.vis_canvas.create_oval(
-                center_x - heat_radius,
-                center_y - heat_radius,
-                center_x + heat_radius,
-                center_y + heat_radius,
+            self._draw_vis_item(
+                ("node", gateway_ip), "oval",
+                (center_x - heat_radius,
+                 center_y - heat_radius,
+                 center_x + heat_radius,
+                 center_y + heat_radius),
                 fill=heat_color,
                 outline="#000000",
                 width=2,
-                tags=("gateway", gateway_ip)
+                tags=("gateway", gateway_ip, f"dev_{gateway_ip}")
             )
             
             # Desenha o texto do gateway
-            self.vis_canvas.create_text(
-                center_x,
-                center_y,
+            self._draw_vis_item(
+                ("label", gateway_ip), "text",
+                (center_x, center_y),
                 text="Gateway",
-                font=("Segoe UI", 10, "bold"),
-                tags=("gateway_text", gateway_ip)
+                font=self._font_gateway,
+                tags=("gateway_text", gateway_ip, f"dev_{gateway_ip}")
             )
             
             # Adiciona texto com número de portas
             if gateway_ports > 0:
-                self.vis_canvas.create_text(
-                    center_x,
-                    center_y + 15,
+                self._draw_vis_item(
+                    ("port_count", gateway_ip), "text",
+                    (center_x, center_y + 15),
                     text=f"{gateway_ports} portas",
-                    font=("Segoe UI", 8),
-                    tags=("gateway_ports", gateway_ip)
+                    font=self._font_label,
+                    tags=("gateway_ports", gateway_ip, f"dev_{gateway_ip}")
                 )
         
         # Conta os dispositivos (excluindo o gateway)
-        devices = [ip for ip in self.scanner.scan_results.keys() if ip != gateway_ip]
+        devices = sorted(results.keys() - {gateway_ip}, key=ip_sort_key)
         num_devices = len(devices)
         
         if num_devices > 0:
-            # Ângulo entre dispositivos
-            angle_step = 360 / num_devices
+            # Calcula as posições de todos os dispositivos no círculo de uma vez
+            angles = np.linspace(0, 2 * np.pi, num_devices, endpoint=False)
+            xs = (center_x + device_radius * np.cos(angles)).tolist()
+            ys = (center_y + device_radius * np.sin(angles)).tolist()
+            
+            # Desenha as linhas para o gateway
+            if gateway_ip and gateway_ip in results:
+                self._draw_spokes((center_x, center_y), zip(xs, ys), fill=line_color, width=1)
             
             # Desenha os dispositivos em círculo
-            for i, ip in enumerate(devices):
-                # Calcula a posição
-                angle = math.radians(i * angle_step)
-                x = center_x + device_radius * math.cos(angle)
-                y = center_y + device_radius * math.sin(angle)
+            for ip, x, y in zip(devices, xs, ys):
+                # Dados do dispositivo, obtidos uma única vez por iteração
+                device_data = results[ip]
+                ports = device_data.get('ports', EMPTY_PORTS)
                 
                 # Conta portas abertas para o mapa de calor
-                num_ports = len(self.scanner.scan_results[ip].get('ports', {}))
+                num_ports = len(ports)
                 
                 # Determina o raio baseado no número de portas (mapa de calor)
-                heat_radius = get_heat_radius(num_ports, 0, max_ports, node_radius, node_radius * 1.8)
+                heat_index = min(num_ports, max_ports)
+                heat_radius = node_radii[heat_index]
                 
                 # Determina a cor base
                 if ip == self.scanner.local_ip:
@@ -1481,123 +1983,91 @@ class NetworkScannerGUI:
                     label = "Este PC"
                 else:
                     # Usa o mapa de calor para a cor
-                    base_color = get_heat_color(num_ports, 0, max_ports)
-                    hostname = self.scanner.scan_results[ip].get('hostname')
+                    base_color = node_colors[heat_index]
+                    hostname = device_data.get('hostname')
                     if hostname:
                         label = hostname.split('.')[0]  # Usa apenas a primeira parte do hostname
                     else:
                         label = ip.split('.')[-1]  # Usa apenas o último octeto do IP
                 
-                # Desenha a linha para o gateway
-                if gateway_ip and gateway_ip in self.scanner.scan_results:
-                    self.vis_canvas.create_line(
-                        center_x, center_y,
-                        x, y,
-                        fill=line_color,
-                        width=1,
-                        tags=("line", f"{gateway_ip}_{ip}")
-                    )
-                
                 # Desenha o círculo do dispositivo com mapa de calor
-                self.vis_canvas.create_oval(
-                    x - heat_radius,
-                    y - heat_radius,
-                    x + heat_radius,
-                    y + heat_radius,
+                self._draw_vis_item(
+                    ("node", ip), "oval",
+                    (x - heat_radius,
+                     y - heat_radius,
+                     x + heat_radius,
+                     y + heat_radius),
                     fill=base_color,
                     outline="#000000",
                     width=1,
-                    tags=("device", ip)
+                    tags=("device", ip, f"dev_{ip}")
                 )
                 
                 # Desenha o texto do dispositivo
-                self.vis_canvas.create_text(
-                    x,
-                    y,
+                self._draw_vis_item(
+                    ("label", ip), "text",
+                    (x, y),
                     text=label,
-                    font=("Segoe UI", 8),
-                    tags=("device_text", ip)
+                    font=self._font_label,
+                    tags=("device_text", ip, f"dev_{ip}")
                 )
                 
                 # Desenha o IP abaixo do dispositivo
-                self.vis_canvas.create_text(
-                    x,
-                    y + heat_radius + 10,
+                self._draw_vis_item(
+                    ("ip_text", ip), "text",
+                    (x, y + heat_radius + 10),
                     text=ip,
-                    font=("Segoe UI", 7),
-                    tags=("ip_text", ip)
+                    font=self._font_small,
+                    tags=("ip_text", ip, f"dev_{ip}")
                 )
                 
                 # Adiciona texto com número de portas
                 if num_ports > 0:
-                    self.vis_canvas.create_text(
-                        x,
-                        y + 12,
+                    self._draw_vis_item(
+                        ("port_count", ip), "text",
+                        (x, y + 12),
                         text=f"{num_ports}",
-                        font=("Segoe UI", 7, "bold"),
-                        tags=("port_count", ip)
+                        font=self._font_small_bold,
+                        tags=("port_count", ip, f"dev_{ip}")
                     )
         
         # Adiciona título
-        self.vis_canvas.create_text(
-            center_x,
-            20,
+        self._draw_vis_item(
+            ("title",), "text",
+            (center_x, 20),
             text=f"Visualização da Rede: {self.scanner.network}",
-            font=("Segoe UI", 12, "bold"),
+            font=self._font_title,
             tags=("title")
         )
         
         # Adiciona legenda
         legend_y = height - 60
         
-        # Gateway
-        self.vis_canvas.create_oval(
-            30, legend_y,
-            50, legend_y + 20,
-            fill=gateway_color,
-            outline="#000000",
-            width=1,
-            tags=("legend")
-        )
-        self.vis_canvas.create_text(
-            100,
-            legend_y + 10,
-            text="Gateway",
-            anchor=tk.W,
-            font=("Segoe UI", 9),
-            tags=("legend")
-        )
-        
-        # Dispositivo local
-        self.vis_canvas.create_oval(
-            200, legend_y,
-            220, legend_y + 20,
-            fill=local_color,
-            outline="#000000",
-            width=1,
-            tags=("legend")
-        )
-        self.vis_canvas.create_text(
-            270,
-            legend_y + 10,
-            text="Este PC",
-            anchor=tk.W,
-            font=("Segoe UI", 9),
-            tags=("legend")
-        )
-        
-        # Adiciona legenda do mapa de calor
-        create_heatmap_legend(
-            self.vis_canvas,
-            width - 300,
-            height - 100,
-            280,
-            80,
-            "Mapa de Calor (portas abertas)"
-        )
+        self._draw_vis_legend(legend_y, (
+            ("gateway", gateway_color, "Gateway"),
+            ("local", local_color, "Este PC"),
+        ))
+        
+        # Adiciona legenda do mapa de calor (reposicionada apenas quando muda de posição)
+        legend_pos = (width - 300, height - 100)
+        if legend_pos != self._heatmap_legend_pos:
+            create_heatmap_legend(
+                self.vis_canvas,
+                legend_pos[0],
+                legend_pos[1],
+                280,
+                80,
+                "Mapa de Calor (portas abertas)"
+            )
+            self._heatmap_legend_pos = legend_pos
     
-    def draw_hierarchical_visualization(self):
-        """Desenha a visualização hierárquica da rede."""
+    def draw_hierarchical_visualization(self, results):
+        """
+        Desenha a visualização hierárquica da rede.
+        
+        Args:
+            results: Cópia dos resultados da varredura feita para esta atualização
+        """
         # Obtém as dimensões do canvas
         width = self.vis_canvas.winfo_width()
         height = self.vis_canvas.winfo_height()
@@ -1621,12 +2091,11 @@ class NetworkScannerGUI:
         device_color = "#6495ED"   # Azul
         line_color = "#CCCCCC"     # Cinza claro
         
-        # Encontra o número máximo de portas abertas para escala do mapa de calor
-        max_ports = 1  # Evita divisão por zero
-        for ip, device_data in self.scanner.scan_results.items():
-            num_ports = len(device_data.get('ports', {}))
-            if num_ports > max_ports:
-                max_ports = num_ports
+        # Número máximo de portas abertas para escala do mapa de calor
+        max_ports = self.get_max_open_ports()
+        
+        # Cores e raios dos dispositivos para cada número de portas abertas
+        node_colors, node_radii = self.heat_tables(max_ports, node_radius, node_radius * 1.8)
         
         # Posição do gateway
         gateway_ip = self.scanner.gateway
@@ -1634,9 +2103,9 @@ class NetworkScannerGUI:
         gateway_y = margin_top + 30
         
         # Desenha o gateway
-        if gateway_ip and gateway_ip in self.scanner.scan_results:
+        if gateway_ip and gateway_ip in results:
             # Conta portas abertas no gateway
-            gateway_ports = len(self.scanner.scan_results[gateway_ip].get('ports', {}))
+            gateway_ports = len(results[gateway_ip].get('ports', EMPTY_PORTS))
             
             # Determina o raio baseado no número de portas (mapa de calor)
             heat_radius = get_heat_radius(gateway_ports, 0, max_ports, node_radius, node_radius * 1.5)
@@ -1645,47 +2114,48 @@ class NetworkScannerGUI:
             heat_color = get_heat_color(gateway_ports, 0, max_ports)
             
             # Desenha o círculo do gateway
-            self.vis_canvas.create_oval(
-                gateway_x - heat_radius,
-                gateway_y - heat_radius,
-                gateway_x + heat_radius,
-                gateway_y + heat_radius,
+            self._draw_vis_item(
+                ("node", gateway_ip), "oval",
+                (gateway_x - heat_radius,
+                 gateway_y - heat_radius,
+                 gateway_x + heat_radius,
+                 gateway_y + heat_radius),
                 fill=heat_color,
                 outline="#000000",
                 width=2,
-                tags=("gateway", gateway_ip)
+                tags=("gateway", gateway_ip, f"dev_{gateway_ip}")
             )
             
             # Desenha o texto do gateway
-            self.vis_canvas.create_text(
-                gateway_x,
-                gateway_y,
+            self._draw_vis_item(
+                ("label", gateway_ip), "text",
+                (gateway_x, gateway_y),
                 text="GW",
-                font=("Segoe UI", 8, "bold"),
-                tags=("gateway_text", gateway_ip)
+                font=self._font_label_bold,
+                tags=("gateway_text", gateway_ip, f"dev_{gateway_ip}")
             )
             
             # Desenha o IP do gateway
-            self.vis_canvas.create_text(
-                gateway_x,
-                gateway_y - heat_radius - 10,
+            self._draw_vis_item(
+                ("ip_text", gateway_ip), "text",
+                (gateway_x, gateway_y - heat_radius - 10),
                 text=gateway_ip,
-                font=("Segoe UI", 8),
-                tags=("ip_text", gateway_ip)
+                font=self._font_label,
+                tags=("ip_text", gateway_ip, f"dev_{gateway_ip}")
             )
             
             # Adiciona texto com número de portas
             if gateway_ports > 0:
-                self.vis_canvas.create_text(
-                    gateway_x,
-                    gateway_y + 12,
+                self._draw_vis_item(
+                    ("port_count", gateway_ip), "text",
+                    (gateway_x, gateway_y + 12),
                     text=f"{gateway_ports}",
-                    font=("Segoe UI", 7, "bold"),
-                    tags=("port_count", gateway_ip)
+                    font=self._font_small_bold,
+                    tags=("port_count", gateway_ip, f"dev_{gateway_ip}")
                 )
         
         # Conta os dispositivos (excluindo o gateway)
-        devices = [ip for ip in self.scanner.scan_results.keys() if ip != gateway_ip]
+        devices = sorted(results.keys() - {gateway_ip}, key=ip_sort_key)
         num_devices = len(devices)
         
         if num_devices > 0:
@@ -1695,16 +2165,31 @@ class NetworkScannerGUI:
             # Posição Y dos dispositivos
             device_y = gateway_y + 100
             
+            # Calcula a posição X de todos os dispositivos de uma vez
+            device_xs = (margin_left + device_spacing * np.arange(1, num_devices + 1)).tolist()
+            
+            # Desenha as linhas para o gateway (as pontas ficam sob os círculos)
+            if gateway_ip and gateway_ip in results:
+                self._draw_spokes(
+                    (gateway_x, gateway_y),
+                    ((device_x, device_y) for device_x in device_xs),
+                    fill=line_color,
+                    width=1
+                )
+            
             # Desenha os dispositivos em linha
-            for i, ip in enumerate(devices):
-                # Calcula a posição X
-                device_x = margin_left + device_spacing * (i + 1)
+            for ip, device_x in zip(devices, device_xs):
+                
+                # Dados do dispositivo, obtidos uma única vez por iteração
+                device_data = results[ip]
+                ports = device_data.get('ports', EMPTY_PORTS)
                 
                 # Conta portas abertas para o mapa de calor
-                num_ports = len(self.scanner.scan_results[ip].get('ports', {}))
+                num_ports = len(ports)
                 
                 # Determina o raio baseado no número de portas (mapa de calor)
-                heat_radius = get_heat_radius(num_ports, 0, max_ports, node_radius, node_radius * 1.8)
+                heat_index = min(num_ports, max_ports)
+                heat_radius = node_radii[heat_index]
                 
                 # Determina a cor
                 if ip == self.scanner.local_ip:
@@ -1712,148 +2197,132 @@ class NetworkScannerGUI:
                     label = "Este PC"
                 else:
                     # Usa o mapa de calor para a cor
-                    color = get_heat_color(num_ports, 0, max_ports)
-                    hostname = self.scanner.scan_results[ip].get('hostname')
+                    color = node_colors[heat_index]
+                    hostname = device_data.get('hostname')
                     if hostname:
                         label = hostname.split('.')[0]  # Usa apenas a primeira parte do hostname
                     else:
                         label = ip.split('.')[-1]  # Usa apenas o último octeto do IP
                 
-                # Desenha a linha para o gateway
-                if gateway_ip and gateway_ip in self.scanner.scan_results:
-                    self.vis_canvas.create_line(
-                        gateway_x, gateway_y + heat_radius,
-                        device_x, device_y - heat_radius,
-                        fill=line_color,
-                        width=1,
-                        tags=("line", f"{gateway_ip}_{ip}")
-                    )
-                
                 # Desenha o círculo do dispositivo com mapa de calor
-                self.vis_canvas.create_oval(
-                    device_x - heat_radius,
-                    device_y - heat_radius,
-                    device_x + heat_radius,
-                    device_y + heat_radius,
+                self._draw_vis_item(
+                    ("node", ip), "oval",
+                    (device_x - heat_radius,
+                     device_y - heat_radius,
+                     device_x + heat_radius,
+                     device_y + heat_radius),
                     fill=color,
                     outline="#000000",
                     width=1,
-                    tags=("device", ip)
+                    tags=("device", ip, f"dev_{ip}")
                 )
                 
                 # Desenha o texto do dispositivo
-                self.vis_canvas.create_text(
-                    device_x,
-                    device_y,
+                self._draw_vis_item(
+                    ("label", ip), "text",
+                    (device_x, device_y),
                     text=label,
-                    font=("Segoe UI", 8),
-                    tags=("device_text", ip)
+                    font=self._font_label,
+                    tags=("device_text", ip, f"dev_{ip}")
                 )
                 
                 # Desenha o IP abaixo do dispositivo
-                self.vis_canvas.create_text(
-                    device_x,
-                    device_y + heat_radius + 10,
+                self._draw_vis_item(
+                    ("ip_text", ip), "text",
+                    (device_x, device_y + heat_radius + 10),
                     text=ip,
-                    font=("Segoe UI", 7),
-                    tags=("ip_text", ip)
+                    font=self._font_small,
+                    tags=("ip_text", ip, f"dev_{ip}")
                 )
                 
                 # Adiciona texto com número de portas
                 if num_ports > 0:
-                    self.vis_canvas.create_text(
-                        device_x,
-                        device_y + 12,
+                    self._draw_vis_item(
+                        ("port_count", ip), "text",
+                        (device_x, device_y + 12),
                         text=f"{num_ports}",
-                        font=("Segoe UI", 7, "bold"),
-                        tags=("port_count", ip)
+                        font=self._font_small_bold,
+                        tags=("port_count", ip, f"dev_{ip}")
                     )
                 
                 # Linha as portas abertas, se houver
-                ports = self.scanner.scan_results[ip].get('ports', {})
                 if ports:
-                    ports_str = ", ".join([str(port) for port in list(ports.keys())[:5]])
+                    ports_str = ", ".join(map(str, islice(ports, 5)))
                     if len(ports) > 5:
                         ports_str += "..."
                     
-                    self.vis_canvas.create_text(
-                        device_x,
-                        device_y + heat_radius + 25,
+                    self._draw_vis_item(
+                        ("ports_text", ip), "text",
+                        (device_x, device_y + heat_radius + 25),
                         text=f"Portas: {ports_str}",
-                        font=("Segoe UI", 7),
-                        tags=("ports_text", ip)
+                        font=self._font_small,
+                        tags=("ports_text", ip, f"dev_{ip}")
                     )
         
         # Adiciona título
-        self.vis_canvas.create_text(
-            width // 2,
-            20,
+        self._draw_vis_item(
+            ("title",), "text",
+            (width // 2, 20),
             text=f"Visualização Hierárquica da Rede: {self.scanner.network}",
-            font=("Segoe UI", 12, "bold"),
+            font=self._font_title,
             tags=("title")
         )
         
         # Adiciona legenda
         legend_y = height - 30
         
-        # Gateway
-        self.vis_canvas.create_oval(
-            30, legend_y,
-            50, legend_y + 20,
-            fill=gateway_color,
-            outline="#000000",
-            width=1,
-            tags=("legend")
-        )
-        self.vis_canvas.create_text(
-            100,
-            legend_y + 10,
-            text="Gateway",
-            anchor=tk.W,
-            font=("Segoe UI", 9),
-            tags=("legend")
-        )
+        self._draw_vis_legend(legend_y, (
+            ("gateway", gateway_color, "Gateway"),
+            ("local", local_color, "Este PC"),
+            ("device", device_color, "Outros Dispositivos"),
+        ))
+    
+    def request_force_layout(self):
+        """
+        Inicia o cálculo do layout de força em segundo plano, se o conjunto de
+        dispositivos mudou desde o último cálculo.
+        """
+        layout_key = frozenset(self._force_positions)
+        if layout_key == self._force_layout_key:
+            return
+        self._force_layout_key = layout_key
         
-        # Dispositivo local
-        self.vis_canvas.create_oval(
-            200, legend_y,
-            220, legend_y + 20,
-            fill=local_color,
-            outline="#000000",
-            width=1,
-            tags=("legend")
-        )
-        self.vis_canvas.create_text(
-            270,
-            legend_y + 10,
-            text="Este PC",
-            anchor=tk.W,
-            font=("Segoe UI", 9),
-            tags=("legend")
-        )
+        if self._layout_executor is None:
+            self._layout_executor = ThreadPoolExecutor(max_workers=1)
         
-        # Outros dispositivos
-        self.vis_canvas.create_oval(
-            370, legend_y,
-            390, legend_y + 20,
-            fill=device_color,
-            outline="#000000",
-            width=1,
-            tags=("legend")
-        )
-        self.vis_canvas.create_text(
-            440,
-            legend_y + 10,
-            text="Outros Dispositivos",
-            anchor=tk.W,
-            font=("Segoe UI", 9),
-            tags=("legend")
+        ips = list(self._force_positions)
+        initial = [self._force_positions[ip] for ip in ips]
+        future = self._layout_executor.submit(compute_force_layout, initial)
+        future.add_done_callback(
+            lambda f: self.root.after(0, self._apply_force_layout, layout_key, ips, f)
         )
     
-    def draw_force_visualization(self):
-        """Desenha a visualização de força da rede."""
-        # Esta visualização é uma simulação simplificada de um layout de força
-        # Em uma implementação real, seria usado um algoritmo de layout de força completo
+    def _apply_force_layout(self, layout_key, ips, future):
+        """
+        Aplica o layout de força calculado, se ainda corresponder aos dispositivos atuais.
+        
+        Args:
+            layout_key: Chave do conjunto de dispositivos usado no cálculo
+            ips: IPs dos dispositivos, na ordem das posições calculadas
+            future: Future com as posições calculadas
+        """
+        if layout_key != self._force_layout_key or future.cancelled() or future.exception():
+            return
+        
+        self._force_positions.update(zip(ips, future.result()))
+        if self._drawn_vis_type == "força":
+            self._last_drawn_state = None
+            self.schedule_vis_update()
+    
+    def draw_force_visualization(self, results):
+        """
+        Desenha a visualização de força da rede.
+        
+        Args:
+            results: Cópia dos resultados da varredura feita para esta atualização
+        """
+        # Os dispositivos novos recebem uma posição aleatória, refinada em segundo
+        # plano pelo algoritmo de Fruchterman-Reingold (ver compute_force_layout)
         
         # Obtém as dimensões do canvas
         width = self.vis_canvas.winfo_width()
@@ -1880,32 +2349,33 @@ class NetworkScannerGUI:
         
         # Posição do gateway
         gateway_ip = self.scanner.gateway
-        if gateway_ip and gateway_ip in self.scanner.scan_results:
+        if gateway_ip and gateway_ip in results:
             positions[gateway_ip] = (width // 2, height // 2)
         
-        # Gera posições aleatórias para os dispositivos
-        import random
-        random.seed(42)  # Para reprodutibilidade
+        # Descarta as posições de dispositivos que não estão mais nos resultados
+        for ip in self._force_positions.keys() - results.keys():
+            del self._force_positions[ip]
         
-        for ip in self.scanner.scan_results:
+        for ip in results:
             if ip != gateway_ip:
-                # Gera uma posição aleatória dentro da área útil
-                x = margin + random.random() * usable_width
-                y = margin + random.random() * usable_height
-                positions[ip] = (x, y)
-        
-        # Desenha as linhas entre dispositivos
-        for ip, (x, y) in positions.items():
-            # Desenha a linha para o gateway
-            if gateway_ip and gateway_ip in positions and ip != gateway_ip:
-                gw_x, gw_y = positions[gateway_ip]
-                self.vis_canvas.create_line(
-                    gw_x, gw_y,
-                    x, y,
-                    fill=line_color,
-                    width=1,
-                    tags=("line", f"{gateway_ip}_{ip}")
-                )
+                # Gera uma posição aleatória apenas para dispositivos novos; as
+                # posições são relativas à área útil e se mantêm entre atualizações
+                if ip not in self._force_positions:
+                    self._force_positions[ip] = (self._force_random.random(), self._force_random.random())
+                rel_x, rel_y = self._force_positions[ip]
+                positions[ip] = (margin + rel_x * usable_width, margin + rel_y * usable_height)
+        
+        # Recalcula o layout em segundo plano quando o conjunto de dispositivos muda
+        self.request_force_layout()
+        
+        # Desenha as linhas entre o gateway e os dispositivos
+        if gateway_ip and gateway_ip in positions and len(positions) > 1:
+            self._draw_spokes(
+                positions[gateway_ip],
+                (position for ip, position in positions.items() if ip != gateway_ip),
+                fill=line_color,
+                width=1
+            )
         
         # Desenha os dispositivos
         for ip, (x, y) in positions.items():
@@ -1918,107 +2388,60 @@ class NetworkScannerGUI:
                 label = "Este PC"
             else:
                 color = device_color
-                hostname = self.scanner.scan_results[ip].get('hostname')
+                hostname = results[ip].get('hostname')
                 if hostname:
                     label = hostname.split('.')[0]  # Usa apenas a primeira parte do hostname
                 else:
                     label = ip.split('.')[-1]  # Usa apenas o último octeto do IP
             
             # Desenha o círculo do dispositivo
-            self.vis_canvas.create_oval(
-                x - node_radius,
-                y - node_radius,
-                x + node_radius,
-                y + node_radius,
+            self._draw_vis_item(
+                ("node", ip), "oval",
+                (x - node_radius,
+                 y - node_radius,
+                 x + node_radius,
+                 y + node_radius),
                 fill=color,
                 outline="#000000",
                 width=1,
-                tags=("device", ip)
+                tags=("device", ip, f"dev_{ip}")
             )
             
             # Desenha o texto do dispositivo
-            self.vis_canvas.create_text(
-                x,
-                y,
+            self._draw_vis_item(
+                ("label", ip), "text",
+                (x, y),
                 text=label,
-                font=("Segoe UI", 8),
-                tags=("device_text", ip)
+                font=self._font_label,
+                tags=("device_text", ip, f"dev_{ip}")
             )
             
             # Desenha o IP abaixo do dispositivo
-            self.vis_canvas.create_text(
-                x,
-                y + node_radius + 10,
+            self._draw_vis_item(
+                ("ip_text", ip), "text",
+                (x, y + node_radius + 10),
                 text=ip,
-                font=("Segoe UI", 7),
-                tags=("ip_text", ip)
+                font=self._font_small,
+                tags=("ip_text", ip, f"dev_{ip}")
             )
         
         # Adiciona título
-        self.vis_canvas.create_text(
-            width // 2,
-            20,
+        self._draw_vis_item(
+            ("title",), "text",
+            (width // 2, 20),
             text=f"Visualização de Força da Rede: {self.scanner.network}",
-            font=("Segoe UI", 12, "bold"),
+            font=self._font_title,
             tags=("title")
         )
         
         # Adiciona legenda
         legend_y = height - 30
         
-        # Gateway
-        self.vis_canvas.create_oval(
-            30, legend_y,
-            50, legend_y + 20,
-            fill=gateway_color,
-            outline="#000000",
-            width=1,
-            tags=("legend")
-        )
-        self.vis_canvas.create_text(
-            100,
-            legend_y + 10,
-            text="Gateway",
-            anchor=tk.W,
-            font=("Segoe UI", 9),
-            tags=("legend")
-        )
-        
-        # Dispositivo local
-        self.vis_canvas.create_oval(
-            200, legend_y,
-            220, legend_y + 20,
-            fill=local_color,
-            outline="#000000",
-            width=1,
-            tags=("legend")
-        )
-        self.vis_canvas.create_text(
-            270,
-            legend_y + 10,
-            text="Este PC",
-            anchor=tk.W,
-            font=("Segoe UI", 9),
-            tags=("legend")
-        )
-        
-        # Outros dispositivos
-        self.vis_canvas.create_oval(
-            370, legend_y,
-            390, legend_y + 20,
-            fill=device_color,
-            outline="#000000",
-            width=1,
-            tags=("legend")
-        )
-        self.vis_canvas.create_text(
-            440,
-            legend_y + 10,
-            text="Outros Dispositivos",
-            anchor=tk.W,
-            font=("Segoe UI", 9),
-            tags=("legend")
-        )
+        self._draw_vis_legend(legend_y, (
+            ("gateway", gateway_color, "Gateway"),
+            ("local", local_color, "Este PC"),
+            ("device", device_color, "Outros Dispositivos"),
+        ))
     
     def show_settings(self):
         """Exibe a janela de configurações."""
@@ -2108,10 +2531,16 @@ class NetworkScannerGUI:
     def show_network_visualization(self):
         """Exibe a aba de visualização da rede."""
         self.notebook.select(self.visualization_frame)
-        self.update_network_visualization()
+        self.schedule_vis_update()
     
     def show_help(self):
         """Exibe a ajuda da aplicação."""
+        # Reaproveita a janela já criada
+        if self._help_window is not None and self._help_window.winfo_exists():
+            self._help_window.deiconify()
+            self._help_window.lift()
+            return
+        
         help_text = """
         Mini Ferramenta de Varredura de Rede
         
@@ -2145,6 +2574,7 @@ class NetworkScannerGUI:
         help_window.geometry("600x500")
         help_window.minsize(600, 500)
         help_window.transient(self.root)
+        help_window.protocol("WM_DELETE_WINDOW", help_window.withdraw)
         
         # Frame para o texto de ajuda
         help_frame = ttk.Frame(help_window, padding=10)
@@ -2162,11 +2592,19 @@ class NetworkScannerGUI:
         help_text_widget.config(yscrollcommand=scrollbar.set)
         
         # Botão para fechar
-        close_button = ttk.Button(help_window, text="Fechar", command=help_window.destroy)
+        close_button = ttk.Button(help_window, text="Fechar", command=help_window.withdraw)
         close_button.pack(pady=10)
+        
+        # Guarda a janela para as próximas aberturas
+        self._help_window = help_window
     
     def show_about(self):
         """Exibe informações sobre a aplicação."""
+        # Reaproveita a janela já criada
+        if self._about_window is not None and self._about_window.winfo_exists():
+            self.show_dialog(self._about_window)
+            return
+        
         about_text = """
         Mini Ferramenta de Varredura de Rede
         
@@ -2193,6 +2631,7 @@ class NetworkScannerGUI:
         about_window.minsize(400, 300)
         about_window.transient(self.root)
         about_window.grab_set()
+        about_window.protocol("WM_DELETE_WINDOW", lambda: self.hide_dialog(about_window))
         
         # Frame para as informações
         about_frame = ttk.Frame(about_window, padding=10)
@@ -2209,20 +2648,11 @@ class NetworkScannerGUI:
         about_text_widget.config(state=tk.DISABLED)
         
         # Botão para fechar
-        close_button = ttk.Button(about_window, text="Fechar", command=about_window.destroy)
+        close_button = ttk.Button(about_window, text="Fechar", command=lambda: self.hide_dialog(about_window))
         close_button.pack(pady=10)
-    
-    def check_scan_status(self):
-        """Verifica periodicamente o status da varredura."""
-        # Atualiza o status da varredura
-        if self.scan_running:
-            # Atualiza a barra de progresso (simulação)
-            current = self.progress_var.get()
-            if current < 90:  # Limita a 90% para que a conclusão real chegue a 100%
-                self.progress_var.set(current + 1)
         
-        # Agenda a próxima verificação
-        self.root.after(100, self.check_scan_status)
+        # Guarda a janela para as próximas aberturas
+        self._about_window = about_window
     
     def on_close(self):
         """Manipula o fechamento da janela."""
@@ -2230,6 +2660,18 @@ class NetworkScannerGUI:
         if self.scan_running:
             self.stop_scan()
         
+        # Encerra a thread de visualizações avançadas
+        self.advanced_visualization.shutdown()
+        
+        # Encerra o cálculo de layout em segundo plano
+        if self._layout_executor is not None:
+            self._layout_executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Cancela as varreduras de portas e encerra o seu laço
+        self.cancel_port_scans()
+        if self._port_loop is not None:
+            self._port_loop.call_soon_threadsafe(self._port_loop.stop)
+        
         # Fecha a aplicação
         self.root.destroy()
 
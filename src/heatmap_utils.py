@@ -10,31 +10,31 @@ Este módulo contém funções para criar e manipular mapas de calor para visual
 import math
 import colorsys
 import tkinter as tk
+import numpy as np
+from functools import lru_cache
 
-def get_heat_color(value, min_value=0, max_value=10):
+# Pillow é opcional: sem ele, o gradiente da legenda é montado com tk.PhotoImage
+try:
+    from PIL import Image, ImageTk
+except ImportError:
+    Image = ImageTk = None
+
+# Número de faixas de cor no gradiente da legenda
+LEGEND_SEGMENTS = 50
+
+# Número de cores pré-calculadas na tabela do mapa de calor
+HEAT_COLOR_STEPS = 256
+
+def _heat_rgb(normalized):
     """
-    Gera uma cor para o mapa de calor baseado em um valor.
+    Calcula os componentes RGB do mapa de calor para um valor normalizado.
     
     Args:
-        value: Valor a ser convertido em cor (ex: número de portas abertas)
-        min_value: Valor mínimo esperado (padrão: 0)
-        max_value: Valor máximo esperado (padrão: 10)
+        normalized: Valor no intervalo [0, 1]
         
     Returns:
-        str: Código de cor hexadecimal (#RRGGBB)
+        tuple: Componentes (r, g, b) de 0 a 255
     """
-    # Garante que o valor esteja dentro dos limites
-    if value < min_value:
-        value = min_value
-    if value > max_value:
-        value = max_value
-    
-    # Normaliza o valor para o intervalo [0, 1]
-    if max_value == min_value:
-        normalized = 0
-    else:
-        normalized = (value - min_value) / (max_value - min_value)
-    
     # Gera cores do azul (frio) ao vermelho (quente)
     # Azul -> Ciano -> Verde -> Amarelo -> Laranja -> Vermelho
     if normalized < 0.2:
@@ -63,8 +63,45 @@ def get_heat_color(value, min_value=0, max_value=10):
         g = 0
         b = 0
     
-    # Converte para hexadecimal
-    return f"#{r:02x}{g:02x}{b:02x}"
+    return r, g, b
+
+# Tabela de cores do mapa de calor (RGB e hexadecimal), calculada uma única vez na importação
+_HEAT_LUT_RGB = np.array(
+    [_heat_rgb(i / (HEAT_COLOR_STEPS - 1)) for i in range(HEAT_COLOR_STEPS)],
+    dtype=np.uint8
+)
+_HEAT_LUT = ["#" + rgb.tobytes().hex() for rgb in _HEAT_LUT_RGB]
+
+def _normalize(value, min_value, max_value):
+    """
+    Limita um valor ao intervalo [min_value, max_value] e o normaliza para [0, 1].
+    
+    Args:
+        value: Valor a ser normalizado
+        min_value: Valor mínimo esperado
+        max_value: Valor máximo esperado
+        
+    Returns:
+        float: Valor normalizado (0 quando o intervalo é vazio)
+    """
+    value = min(max(value, min_value), max_value)
+    value_range = max_value - min_value
+    return (value - min_value) / value_range if value_range else 0.0
+
+def get_heat_color(value, min_value=0, max_value=10):
+    """
+    Gera uma cor para o mapa de calor baseado em um valor.
+    
+    Args:
+        value: Valor a ser convertido em cor (ex: número de portas abertas)
+        min_value: Valor mínimo esperado (padrão: 0)
+        max_value: Valor máximo esperado (padrão: 10)
+        
+    Returns:
+        str: Código de cor hexadecimal (#RRGGBB)
+    """
+    # Converte o valor no índice da tabela de cores
+    return _HEAT_LUT[int(_normalize(value, min_value, max_value) * (HEAT_COLOR_STEPS - 1))]
 
 def get_heat_alpha_color(value, min_value=0, max_value=10, base_color="#6495ED", alpha_min=0.2, alpha_max=1.0):
     """
@@ -82,23 +119,14 @@ def get_heat_alpha_color(value, min_value=0, max_value=10, base_color="#6495ED",
     Returns:
         tuple: (cor_hex, alpha_value) - Código de cor hexadecimal e valor alpha
     """
-    # Garante que o valor esteja dentro dos limites
-    if value < min_value:
-        value = min_value
-    if value > max_value:
-        value = max_value
-    
-    # Normaliza o valor para o intervalo [0, 1]
-    if max_value == min_value:
-        normalized = 0
-    else:
-        normalized = (value - min_value) / (max_value - min_value)
+    normalized = _normalize(value, min_value, max_value)
     
     # Calcula o valor alpha
     alpha = alpha_min + normalized * (alpha_max - alpha_min)
     
     return (base_color, alpha)
 
+@lru_cache(maxsize=4096)
 def get_heat_radius(value, min_value=0, max_value=10, min_radius=15, max_radius=30):
     """
     Calcula o raio de um círculo baseado em um valor para visualização de mapa de calor.
@@ -113,27 +141,72 @@ def get_heat_radius(value, min_value=0, max_value=10, min_radius=15, max_radius=
     Returns:
         float: Valor do raio
     """
-    # Garante que o valor esteja dentro dos limites
-    if value < min_value:
-        value = min_value
-    if value > max_value:
-        value = max_value
-    
-    # Normaliza o valor para o intervalo [0, 1]
-    if max_value == min_value:
-        normalized = 0
-    else:
-        normalized = (value - min_value) / (max_value - min_value)
+    normalized = _normalize(value, min_value, max_value)
     
     # Calcula o raio
     radius = min_radius + normalized * (max_radius - min_radius)
     
     return radius
 
+def _gradient_indices(width, segments):
+    """
+    Calcula o índice na tabela de cores de cada coluna de pixels do gradiente.
+    
+    Args:
+        width: Largura do gradiente em pixels
+        segments: Número de faixas de cor do gradiente
+        
+    Returns:
+        numpy.ndarray: Índices na tabela de cores, um por coluna
+    """
+    segment = np.minimum(np.arange(width) * segments // width, segments - 1)
+    return (segment / max(segments - 1, 1) * (HEAT_COLOR_STEPS - 1)).astype(np.intp)
+
+def create_heatmap_gradient(width, height, segments=LEGEND_SEGMENTS):
+    """
+    Cria uma imagem com o gradiente de cores do mapa de calor (requer Pillow).
+    
+    Args:
+        width, height: Largura e altura da imagem em pixels
+        segments: Número de faixas de cor do gradiente
+        
+    Returns:
+        PIL.Image.Image: Imagem do gradiente
+    """
+    # Repete a linha de pixels até a altura desejada
+    pixels = np.tile(_HEAT_LUT_RGB[_gradient_indices(width, segments)], (height, 1, 1))
+    return Image.fromarray(pixels, 'RGB')
+
+def create_heatmap_photo(master, width, height, segments=LEGEND_SEGMENTS):
+    """
+    Cria a imagem Tk do gradiente de cores do mapa de calor.
+    
+    Usa Pillow quando disponível; caso contrário, preenche um tk.PhotoImage
+    com uma única linha de cores, replicada pelo Tk até a altura desejada.
+    
+    Args:
+        master: Widget dono da imagem
+        width, height: Largura e altura da imagem em pixels
+        segments: Número de faixas de cor do gradiente
+        
+    Returns:
+        PhotoImage: Imagem do gradiente
+    """
+    if ImageTk is not None:
+        return ImageTk.PhotoImage(create_heatmap_gradient(width, height, segments), master=master)
+    
+    photo = tk.PhotoImage(master=master, width=width, height=height)
+    row = " ".join(_HEAT_LUT[i] for i in _gradient_indices(width, segments))
+    photo.put(f"{{{row}}}", to=(0, 0, width, height))
+    return photo
+
 def create_heatmap_legend(canvas, x, y, width, height, title="Intensidade (portas abertas)"):
     """
     Cria uma legenda para o mapa de calor no canvas.
     
+    Se a legenda já foi criada neste canvas e seus itens ainda existem, eles são
+    apenas reposicionados, sem apagar e recriar os itens.
+    
     Args:
         canvas: Canvas Tkinter onde desenhar a legenda
         x, y: Coordenadas do canto superior esquerdo da legenda
@@ -143,97 +216,76 @@ def create_heatmap_legend(canvas, x, y, width, height, title="Intensidade (porta
     Returns:
         None
     """
-    # Desenha o fundo da legenda
-    canvas.create_rectangle(
-        x, y,
-        x + width, y + height,
-        fill="#FFFFFF",
-        outline="#000000",
-        width=1,
-        tags=("heatmap_legend")
-    )
-    
-    # Desenha o título
-    canvas.create_text(
-        x + width // 2,
-        y + 15,
-        text=title,
-        font=("Segoe UI", 9, "bold"),
-        tags=("heatmap_legend")
-    )
-    
-    # Desenha o gradiente
-    gradient_width = width - 20
+    # Dimensões do gradiente
+    gradient_width = int(width - 20)
     gradient_height = 20
     gradient_x = x + 10
     gradient_y = y + 30
     
-    # Número de segmentos no gradiente
-    segments = 50
-    segment_width = gradient_width / segments
+    # Gradiente pré-renderizado em uma única imagem, reaproveitada enquanto
+    # o tamanho não mudar; a referência fica no canvas para não ser coletada
+    photo = getattr(canvas, '_heatmap_gradient', None)
+    if photo is None or (photo.width(), photo.height()) != (gradient_width, gradient_height):
+        photo = create_heatmap_photo(canvas, gradient_width, gradient_height)
+        canvas._heatmap_gradient = photo
     
-    for i in range(segments):
-        # Valor normalizado de 0 a 1
-        normalized = i / (segments - 1)
-        
-        # Obtém a cor para este segmento
-        if normalized < 0.2:
-            # Azul para Ciano
-            r = 0
-            g = int(255 * (normalized / 0.2))
-            b = 255
-        elif normalized < 0.4:
-            # Ciano para Verde
-            r = 0
-            g = 255
-            b = int(255 * (1 - (normalized - 0.2) / 0.2))
-        elif normalized < 0.6:
-            # Verde para Amarelo
-            r = int(255 * ((normalized - 0.4) / 0.2))
-            g = 255
-            b = 0
-        elif normalized < 0.8:
-            # Amarelo para Laranja
-            r = 255
-            g = int(255 * (1 - (normalized - 0.6) / 0.2))
-            b = 0
-        else:
-            # Laranja para Vermelho
-            r = 255
-            g = 0
-            b = 0
-        
-        color = f"#{r:02x}{g:02x}{b:02x}"
-        
-        # Desenha o segmento
-        canvas.create_rectangle(
-            gradient_x + i * segment_width,
-            gradient_y,
-            gradient_x + (i + 1) * segment_width,
-            gradient_y + gradient_height,
-            fill=color,
-            outline="",
-            tags=("heatmap_legend")
-        )
+    # Coordenadas de cada item da legenda
+    coords = {
+        'background': (x, y, x + width, y + height),
+        'title': (x + width // 2, y + 15),
+        'gradient': (gradient_x, gradient_y),
+        'low': (gradient_x, gradient_y + gradient_height + 15),
+        'high': (gradient_x + gradient_width, gradient_y + gradient_height + 15)
+    }
     
-    # Desenha os rótulos
-    canvas.create_text(
-        gradient_x,
-        gradient_y + gradient_height + 15,
-        text="Baixo",
-        font=("Segoe UI", 8),
-        anchor=tk.W,
-        tags=("heatmap_legend")
-    )
+    # Reaproveita os itens existentes (o canvas pode ter sido limpo desde então)
+    items = getattr(canvas, '_heatmap_legend_items', None)
+    if items and canvas.type(items['background']):
+        for name, item_coords in coords.items():
+            canvas.coords(items[name], *item_coords)
+        canvas.itemconfigure(items['title'], text=title)
+        canvas.itemconfigure(items['gradient'], image=photo)
+        return
     
-    canvas.create_text(
-        gradient_x + gradient_width,
-        gradient_y + gradient_height + 15,
-        text="Alto",
-        font=("Segoe UI", 8),
-        anchor=tk.E,
-        tags=("heatmap_legend")
-    )
+    canvas._heatmap_legend_items = {
+        # Fundo da legenda
+        'background': canvas.create_rectangle(
+            *coords['background'],
+            fill="#FFFFFF",
+            outline="#000000",
+            width=1,
+            tags=("heatmap_legend")
+        ),
+        # Título
+        'title': canvas.create_text(
+            *coords['title'],
+            text=title,
+            font=("Segoe UI", 9, "bold"),
+            tags=("heatmap_legend")
+        ),
+        # Gradiente
+        'gradient': canvas.create_image(
+            *coords['gradient'],
+            anchor=tk.NW,
+            image=photo,
+            tags=("heatmap_legend")
+        ),
+        # Rótulos
+        'low': canvas.create_text(
+            *coords['low'],
+            text="Baixo",
+            font=("Segoe UI", 8),
+            anchor=tk.W,
+            tags=("heatmap_legend")
+        ),
+        'high': canvas.create_text(
+            *coords['high'],
+            text="Alto",
+            font=("Segoe UI", 8),
+            anchor=tk.E,
+            tags=("heatmap_legend")
+        )
+    }
 
 # Teste do módulo
 if __name__ == "__main__":
@@ -14,9 +14,14 @@ import numpy as np
 import webbrowser
 import os
 import tempfile
-import random
+import hashlib
 import math
-from plotly.offline import plot
+from pathlib import Path
+from plotly.offline import get_plotlyjs
+
+# Origem do Plotly.js no HTML gerado: 'cdn' carrega a biblioteca da internet;
+# para uso offline, 'directory' grava o plotly.min.js uma única vez ao lado do HTML
+PLOTLYJS_SOURCE = 'cdn'
 
 class Network3DVisualizer:
     """Classe para visualização 3D da topologia de rede."""
@@ -29,6 +34,18 @@ class Network3DVisualizer:
         self.node_sizes = {}
         self.node_labels = {}
         self.edge_colors = {}
+        self._gateway_ip = None
+        
+        # Indica se todas as arestas usam a cor padrão (caso de build_network_graph);
+        # quem definir cores próprias em edge_colors deve desmarcar
+        self._edge_colors_uniform = True
+        
+        # Último layout calculado e a assinatura do grafo (nós e arestas) usada nele
+        self._layout_key = None
+        self._layout_2d = None
+        
+        # Hash do último HTML gravado, para não regravar uma visualização idêntica
+        self._last_html_hash = None
         
         # Cores padrão
         self.default_colors = {
@@ -61,6 +78,19 @@ class Network3DVisualizer:
         self.node_sizes = {}
         self.node_labels = {}
         self.edge_colors = {}
+        self._edge_colors_uniform = True
+        self._gateway_ip = gateway_ip
+        
+        # Referências locais usadas a cada iteração do laço
+        colors = self.default_colors
+        sizes = self.default_sizes
+        node_colors = self.node_colors
+        node_sizes = self.node_sizes
+        node_labels = self.node_labels
+        edge_colors = self.edge_colors
+        add_node = self.graph.add_node
+        add_edge = self.graph.add_edge
+        has_gateway = gateway_ip in scan_results
         
         # Adiciona os nós ao grafo
         for ip, device_data in scan_results.items():
@@ -80,40 +110,45 @@ class Network3DVisualizer:
                     label = f"Dispositivo\n{ip}"
             
             # Adiciona o nó ao grafo
-            self.graph.add_node(ip)
+            add_node(ip)
             
             # Define a cor do nó
-            self.node_colors[ip] = self.default_colors[node_type]
+            node_colors[ip] = colors[node_type]
             
-            # Define o tamanho do nó (baseado no número de portas abertas)
-            ports = device_data.get('ports', {})
-            port_count = len(ports)
-            base_size = self.default_sizes[node_type]
-            self.node_sizes[ip] = base_size + min(port_count, 10)  # Limita o crescimento
+            # Define o tamanho do nó (baseado no número de portas abertas, com crescimento limitado)
+            node_sizes[ip] = sizes[node_type] + min(len(device_data.get('ports') or ()), 10)
             
             # Define o rótulo do nó
-            self.node_labels[ip] = label
+            node_labels[ip] = label
             
             # Adiciona aresta ao gateway (exceto para o próprio gateway)
-            if ip != gateway_ip and gateway_ip in scan_results:
-                self.graph.add_edge(ip, gateway_ip)
-                self.edge_colors[(ip, gateway_ip)] = self.default_colors['edge']
+            if ip != gateway_ip and has_gateway:
+                add_edge(ip, gateway_ip)
+                edge_colors[(ip, gateway_ip)] = colors['edge']
         
         # Gera posições 3D para os nós
         self._generate_3d_positions()
     
     def _generate_3d_positions(self):
         """Gera posições 3D para os nós do grafo."""
-        # Usa o algoritmo de layout spring para posicionamento inicial
-        pos_2d = nx.spring_layout(self.graph, seed=42)
+        # Usa o algoritmo de layout spring para posicionamento inicial,
+        # recalculado apenas quando os nós ou as arestas mudam
+        layout_key = (
+            frozenset(self.graph.nodes()),
+            frozenset(map(frozenset, self.graph.edges()))
+        )
+        if layout_key != self._layout_key:
+            self._layout_2d = nx.spring_layout(self.graph, seed=42, iterations=30)
+            self._layout_key = layout_key
+        pos_2d = self._layout_2d
+        
+        # Coordenadas Z com alguma variação, sorteadas de uma só vez
+        z_values = 0.1 + 0.2 * np.random.default_rng(42).random(len(pos_2d))
         
         # Converte para posições 3D
-        for node, pos in pos_2d.items():
-            # Adiciona uma coordenada Z com alguma variação
-            z = 0.1 + 0.2 * random.random()
-            
+        for (node, pos), z in zip(pos_2d.items(), z_values.tolist()):
             # Para o gateway, coloca no topo
-            if node == list(self.node_colors.keys())[list(self.node_colors.values()).index(self.default_colors['gateway'])]:
+            if node == self._gateway_ip:
                 z = 0.5
             
             self.node_positions[node] = (pos[0], pos[1], z)
@@ -128,22 +163,18 @@ class Network3DVisualizer:
         Returns:
             str: Caminho para o arquivo HTML da visualização
         """
-        # Prepara os dados para o Plotly
-        node_x = []
-        node_y = []
-        node_z = []
-        node_text = []
-        node_color = []
-        node_size = []
-        
-        for node in self.graph.nodes():
-            x, y, z = self.node_positions[node]
-            node_x.append(x)
-            node_y.append(y)
-            node_z.append(z)
-            node_text.append(self.node_labels[node])
-            node_color.append(self.node_colors[node])
-            node_size.append(self.node_sizes[node])
+        # Prepara os dados para o Plotly: posições de todos os nós em um único array (n, 3)
+        nodes = list(self.graph.nodes())
+        node_index = {node: i for i, node in enumerate(nodes)}
+        positions = np.fromiter(
+            (coord for node in nodes for coord in self.node_positions[node]),
+            dtype=np.float64,
+            count=3 * len(nodes)
+        ).reshape(-1, 3)
+        node_x, node_y, node_z = positions.T
+        node_text = [self.node_labels[node] for node in nodes]
+        node_color = [self.node_colors[node] for node in nodes]
+        node_size = [self.node_sizes[node] for node in nodes]
         
         # Cria o gráfico de nós
         node_trace = go.Scatter3d(
@@ -162,24 +193,31 @@ class Network3DVisualizer:
             textposition="top center"
         )
         
-        # Prepara os dados das arestas
-        edge_x = []
-        edge_y = []
-        edge_z = []
-        edge_color = []
+        # Prepara os dados das arestas: cada aresta ocupa três linhas do array
+        # (origem, destino e NaN, que separa as linhas no Plotly)
+        edges = list(self.graph.edges())
+        edge_index = np.array(
+            [(node_index[source], node_index[target]) for source, target in edges],
+            dtype=np.intp
+        ).reshape(-1, 2)
+        segments = np.full((3 * len(edges), 3), np.nan)
+        segments[0::3] = positions[edge_index[:, 0]]
+        segments[1::3] = positions[edge_index[:, 1]]
+        edge_x, edge_y, edge_z = segments.T
         
-        for edge in self.graph.edges():
-            x0, y0, z0 = self.node_positions[edge[0]]
-            x1, y1, z1 = self.node_positions[edge[1]]
-            
-            # Adiciona os pontos para a linha
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-            edge_z.extend([z0, z1, None])
-            
-            # Cor da aresta
-            color = self.edge_colors.get(edge, self.edge_colors.get((edge[1], edge[0]), self.default_colors['edge']))
-            edge_color.extend([color, color, color])
+        # Cor das arestas: uma única cor quando todas são iguais; caso contrário,
+        # uma cor por ponto (repetida para os três pontos de cada aresta)
+        if self._edge_colors_uniform:
+            edge_color = self.default_colors['edge']
+        else:
+            colors = [
+                self.edge_colors.get(edge, self.edge_colors.get((edge[1], edge[0]), self.default_colors['edge']))
+                for edge in edges
+            ]
+            if len(set(colors)) <= 1:
+                edge_color = colors[0] if colors else self.default_colors['edge']
+            else:
+                edge_color = np.repeat(colors, 3).tolist()
         
         # Cria o gráfico de arestas
         edge_trace = go.Scatter3d(
@@ -237,8 +275,24 @@ class Network3DVisualizer:
         temp_dir = tempfile.gettempdir()
         html_file = os.path.join(temp_dir, "network_3d_visualization.html")
         
-        # Configura para incluir todos os recursos necessários no HTML
-        plot(fig, filename=html_file, auto_open=False, include_plotlyjs=True)
+        # O Plotly.js não é embutido no HTML (cerca de 3 MB a cada visualização)
+        # (o id fixo do div evita um uuid aleatório, que mudaria o HTML a cada chamada)
+        html = fig.to_html(
+            include_plotlyjs=PLOTLYJS_SOURCE,
+            full_html=True,
+            config={'responsive': True},
+            div_id="network-3d-visualization"
+        )
+        if PLOTLYJS_SOURCE == 'directory':
+            plotlyjs_file = Path(temp_dir, "plotly.min.js")
+            if not plotlyjs_file.exists():
+                plotlyjs_file.write_text(get_plotlyjs(), encoding='utf-8')
+        
+        # Grava o arquivo apenas se o conteúdo mudou desde a última visualização
+        html_hash = hashlib.sha1(html.encode('utf-8')).digest()
+        if html_hash != self._last_html_hash or not os.path.exists(html_file):
+            Path(html_file).write_text(html, encoding='utf-8')
+            self._last_html_hash = html_hash
         
         return html_file
     
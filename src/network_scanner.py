@@ -8,13 +8,25 @@ Este módulo contém as funcionalidades para descoberta de dispositivos na rede
 verificação de portas abertas e resolução de nomes de dispositivos.
 """
 
+import asyncio
+import errno
 import socket
 import subprocess
-import threading
 import ipaddress
 import time
+import itertools
 import platform
-from queue import Queue
+import random
+import re
+import select
+import selectors
+import struct
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
 from datetime import datetime
 
 # Importa o módulo de detecção de sistema operacional
@@ -23,31 +35,261 @@ try:
 except ImportError:
     print("Módulo de detecção de SO não encontrado. Esta funcionalidade não estará disponível.")
 
+# netifaces é opcional: sem ele, o IP local, o gateway e a rede (/24) são deduzidos
+try:
+    import netifaces
+except ImportError:
+    netifaces = None
+
+# Sistema operacional, consultado uma única vez
+IS_WINDOWS = platform.system() == "Windows"
+
+# Argumentos do ping do sistema para um único pacote com tempo limite de 1 segundo
+PING_ARGS = ("ping", "-n", "1", "-w", "1000") if IS_WINDOWS else ("ping", "-c", "1", "-W", "1")
+
 # Verificar se estamos no Windows para importar bibliotecas específicas
-if platform.system() == "Windows":
+if IS_WINDOWS:
     try:
         from scapy.all import ARP, Ether, srp
     except ImportError:
         print("Scapy não encontrado. Algumas funcionalidades podem não estar disponíveis.")
 
+# Número máximo de pings simultâneos na varredura assíncrona
+PING_CONCURRENCY = 256
+
+# Menor prefixo de rede aceito ao ler a máscara da interface; redes maiores são
+# reduzidas a este tamanho ao redor do IP local para não varrer milhões de hosts
+MIN_NETWORK_PREFIX = 16
+
+# Número de threads que buscam MAC e nome de host dos dispositivos encontrados
+# (limitadas pela espera do DNS, não pela CPU)
+ENRICHMENT_WORKERS = 64
+
+# Validade (segundos) dos nomes de host resolvidos, inclusive das falhas
+HOSTNAME_CACHE_TTL = 900
+
+# Tempo limite (segundos) para aguardar as respostas da varredura ICMP
+ICMP_SWEEP_TIMEOUT = 1.0
+
+# Opção que entrega o TTL das respostas ICMP como dado auxiliar (Linux); nem
+# todas as versões do Python expõem a constante
+IP_RECVTTL = getattr(socket, 'IP_RECVTTL', 12 if sys.platform.startswith('linux') else None)
+
+# Número máximo de conexões simultâneas e tempo limite (segundos) na
+# varredura assíncrona de portas
+PORT_SCAN_CONCURRENCY = 500
+PORT_CONNECT_TIMEOUT = 0.5
+
+# Idade máxima (segundos) da cópia da tabela ARP antes de relê-la quando um
+# IP não é encontrado nela
+ARP_CACHE_MAX_AGE = 1.0
+
+# Linha da tabela ARP com IP e MAC (saída de "arp -a" no Windows, Linux e macOS)
+ARP_ENTRY_RE = re.compile(
+    r'(\d+\.\d+\.\d+\.\d+)\)?\s+(?:at\s+)?([0-9a-f]{1,2}(?:[-:][0-9a-f]{1,2}){5})',
+    re.IGNORECASE
+)
+
+# Códigos de connect_ex() que indicam uma conexão não bloqueante em andamento
+CONNECT_IN_PROGRESS = frozenset({errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN})
+
+# Flags do cabeçalho TCP usadas na varredura SYN
+TCP_SYN = 0x02
+TCP_SYN_ACK = 0x12
+
+# Buffer de recepção do socket bruto da varredura SYN; ele recebe todo o tráfego
+# TCP da máquina, e as respostas perdidas seriam portas abertas não detectadas
+SYN_SCAN_RCVBUF = 4 * 1024 * 1024
+
+# SO_LINGER ativo com tempo zero: o close() envia RST em vez de FIN, sem deixar
+# a porta local em TIME_WAIT a cada porta aberta encontrada
+LINGER_RESET = struct.pack('ii', 1, 0)
+
+# Serviços comuns que podem não estar no banco de dados do sistema
+COMMON_PORTS = {
+    21: "FTP",
+    22: "SSH",
+    23: "Telnet",
+    25: "SMTP",
+    53: "DNS",
+    80: "HTTP",
+    110: "POP3",
+    115: "SFTP",
+    135: "RPC",
+    139: "NetBIOS",
+    143: "IMAP",
+    194: "IRC",
+    443: "HTTPS",
+    445: "SMB",
+    1433: "MSSQL",
+    3306: "MySQL",
+    3389: "RDP",
+    5900: "VNC",
+    8080: "HTTP-Proxy"
+}
+
+@lru_cache(maxsize=None)
+def _service_name(port):
+    """
+    Consulta o nome do serviço de uma porta, uma única vez por porta.
+    
+    Args:
+        port: Número da porta
+        
+    Returns:
+        str: Nome do serviço ou "unknown"
+    """
+    try:
+        return socket.getservbyport(port)
+    except (OSError, OverflowError):
+        return COMMON_PORTS.get(port, "unknown")
+
+def _internet_checksum(data):
+    """
+    Calcula o checksum da Internet (complemento de um) usado por ICMP e TCP.
+    
+    Args:
+        data: Bytes da mensagem com o campo de checksum zerado
+        
+    Returns:
+        int: Checksum de 16 bits
+    """
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+def _build_icmp_echo(ident, seq, payload=b'network-scanner'):
+    """
+    Monta um pacote ICMP Echo Request.
+    
+    Args:
+        ident: Identificador do pacote
+        seq: Número de sequência
+        payload: Dados enviados no pacote
+        
+    Returns:
+        bytes: Pacote ICMP pronto para envio
+    """
+    header = struct.pack('!BBHHH', 8, 0, 0, ident, seq)
+    checksum = _internet_checksum(header + payload)
+    return struct.pack('!BBHHH', 8, 0, checksum, ident, seq) + payload
+
+def _build_tcp_syn(src_ip, dst_ip, src_port, dst_port, seq):
+    """
+    Monta um segmento TCP SYN (sem cabeçalho IP, preenchido pelo kernel).
+    
+    Args:
+        src_ip, dst_ip: Endereços de origem e destino (usados no pseudo-cabeçalho)
+        src_port, dst_port: Portas de origem e destino
+        seq: Número de sequência
+        
+    Returns:
+        bytes: Segmento TCP pronto para envio por um socket bruto
+    """
+    # Deslocamento de dados de 5 palavras (20 bytes), flag SYN e janela máxima
+    header = struct.pack('!HHIIBBHHH', src_port, dst_port, seq, 0, 5 << 4, TCP_SYN, 65535, 0, 0)
+    pseudo_header = socket.inet_aton(src_ip) + socket.inet_aton(dst_ip) + \
+        struct.pack('!BBH', 0, socket.IPPROTO_TCP, len(header))
+    checksum = _internet_checksum(pseudo_header + header)
+    return header[:16] + struct.pack('!H', checksum) + header[18:]
+
+@lru_cache(maxsize=None)
+def _raw_tcp_available():
+    """
+    Verifica, uma única vez, se é possível abrir um socket TCP bruto para a
+    varredura SYN (Linux com privilégios de administrador).
+    
+    Returns:
+        bool: True se a varredura SYN pode ser usada
+    """
+    # No Windows o envio de TCP por socket bruto é bloqueado, e nos BSDs/macOS
+    # o socket bruto não recebe as respostas TCP
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP).close()
+        return True
+    except OSError:
+        return False
+
 class NetworkScanner:
     """Classe principal para varredura de rede local."""
     
     def __init__(self):
         """Inicializa o scanner de rede."""
-        self.local_ip = self.get_local_ip()
-        self.gateway = self.get_gateway()
-        self.network = self.get_network_from_ip(self.local_ip)
+        # Lê a interface padrão diretamente do sistema quando possível
+        default_interface = self.get_default_interface()
+        if default_interface:
+            self.gateway, self.local_ip, self.network = default_interface
+        else:
+            self.local_ip = self.get_local_ip()
+            self.gateway = self.get_gateway()
+            self.network = self.get_network_from_ip(self.local_ip)
         self.scan_results = {}
         self.is_scanning = False
         self.stop_scan_flag = False
         
+        # Versão dos resultados, incrementada a cada alteração em scan_results
+        self._results_versions = itertools.count(1)
+        self.results_version = 0
+        
+        # Progresso da varredura de rede: (hosts verificados, total de hosts)
+        self.progress = (0, 0)
+        
+        # Cache de DNS reverso: IP -> (momento da consulta, nome ou None)
+        self._hostname_cache = {}
+        
+        # Cópia da tabela ARP do sistema (IP -> MAC) e momento da última leitura
+        self._arp_cache = {}
+        self._arp_cache_time = float('-inf')
+        
+        # TTL das respostas da última varredura ICMP (IP -> TTL), usado na
+        # detecção de sistema operacional sem um novo ping
+        self.ttl_by_ip = {}
+        
+        # Consulta antecipadamente os serviços das portas mais comuns
+        for port in COMMON_PORTS:
+            _service_name(port)
+        
         # Inicializa o detector de sistema operacional
         try:
             self.os_detector = OSDetector()
         except NameError:
             self.os_detector = None
     
+    def touch_results(self):
+        """Marca os resultados como alterados, incrementando results_version."""
+        # next() em itertools.count é atômico, mesmo com várias threads de varredura
+        self.results_version = next(self._results_versions)
+    
+    def get_default_interface(self):
+        """
+        Obtém o gateway, o IP local e a rede da interface padrão usando netifaces,
+        com a máscara real da interface (não necessariamente /24).
+        
+        Returns:
+            tuple: (gateway, ip_local, rede) ou None se netifaces não estiver
+            disponível ou não houver rota padrão
+        """
+        if netifaces is None:
+            return None
+        
+        try:
+            gateway, interface = netifaces.gateways()['default'][netifaces.AF_INET][:2]
+            address = netifaces.ifaddresses(interface)[netifaces.AF_INET][0]
+            network = ipaddress.IPv4Interface(f"{address['addr']}/{address['netmask']}").network
+        except (KeyError, IndexError, ValueError, OSError) as e:
+            print(f"Erro ao ler a interface padrão: {e}")
+            return None
+        
+        if network.prefixlen < MIN_NETWORK_PREFIX:
+            network = ipaddress.IPv4Network(f"{address['addr']}/{MIN_NETWORK_PREFIX}", strict=False)
+        
+        return gateway, address['addr'], str(network)
+    
     def get_local_ip(self):
         """Obtém o endereço IP local da máquina."""
         try:
@@ -64,10 +306,10 @@ class NetworkScanner:
     
     def get_gateway(self):
         """Obtém o endereço IP do gateway padrão."""
-        if platform.system() == "Windows":
+        if IS_WINDOWS:
             try:
                 # Executa o comando route print para obter informações de roteamento
-                output = subprocess.check_output("route print 0.0.0.0", shell=True).decode()
+                output = subprocess.check_output(["route", "print", "0.0.0.0"]).decode()
                 lines = output.split('\n')
                 for line in lines:
                     if "0.0.0.0" in line:
@@ -97,25 +339,55 @@ class NetworkScanner:
         network = f"{ip_parts[0]}.{ip_parts[1]}.{ip_parts[2]}.0/24"
         return network
     
-    def scan_network_arp(self, callback=None):
+    def get_host_addresses(self, network):
+        """
+        Enumera os endereços de host de uma rede sem criar um objeto por endereço.
+        
+        Args:
+            network: Rede (ipaddress.IPv4Network)
+            
+        Returns:
+            numpy.ndarray: Endereços em inteiros de 32 bits (numpy.uint32)
+        """
+        first = int(network.network_address)
+        last = first + network.num_addresses
+        
+        # Exclui os endereços de rede e de broadcast, exceto em redes /31 e /32
+        if network.num_addresses > 2:
+            first += 1
+            last -= 1
+        
+        return np.arange(first, last, dtype=np.uint32)
+    
+    def scan_network_arp(self, callback=None, progress_callback=None):
         """
         Varre a rede usando ARP requests (mais rápido, requer scapy).
         
         Args:
             callback: Função de callback para atualizar a interface com o progresso
+            progress_callback: Função chamada com (hosts verificados, total)
         """
-        if platform.system() != "Windows" or 'scapy.all' not in globals():
+        if not IS_WINDOWS or 'scapy.all' not in globals():
             print("Método ARP não disponível. Usando método de ping.")
-            return self.scan_network_ping(callback)
+            return self.scan_network_ping(callback, progress_callback=progress_callback)
         
         self.is_scanning = True
         self.stop_scan_flag = False
         self.scan_results = {}
+        self.touch_results()
         
         try:
             network = self.network
             print(f"Iniciando varredura ARP na rede {network}")
             
+            total_hosts = len(self.get_host_addresses(ipaddress.IPv4Network(network, strict=False)))
+            self.progress = (0, total_hosts)
+            
+            def hosts_checked(count=1):
+                self.progress = (self.progress[0] + count, total_hosts)
+                if progress_callback:
+                    progress_callback(*self.progress)
+            
             # Cria pacote ARP
             arp = ARP(pdst=network)
             ether = Ether(dst="ff:ff:ff:ff:ff:ff")
@@ -131,6 +403,10 @@ class NetworkScanner:
             for sent, received in result:
                 devices.append({'ip': received.psrc, 'mac': received.hwsrc})
             
+            # Os hosts que não responderam já estão verificados; os demais
+            # contam à medida que seus nomes são resolvidos
+            hosts_checked(max(total_hosts - len(devices), 0))
+            
             # Adiciona os dispositivos encontrados aos resultados
             for device in devices:
                 ip = device['ip']
@@ -141,6 +417,8 @@ class NetworkScanner:
                     'status': 'online',
                     'os': {'name': 'Desconhecido', 'confidence': 0}
                 }
+                self.touch_results()
+                hosts_checked()
                 if callback:
                     callback(ip, self.scan_results[ip])
             
@@ -155,77 +433,106 @@ class NetworkScanner:
         
         return self.scan_results
     
-    def scan_network_ping(self, callback=None):
+    def scan_network_ping(self, callback=None, progress_callback=None):
         """
         Varre a rede usando ping (mais lento, mas funciona sem scapy).
         
+        Todas as sondagens rodam em um único laço asyncio (scan_network_async),
+        sem criar uma thread por host; deve ser chamado fora de um laço de eventos.
+        
+        Args:
+            callback: Função de callback para atualizar a interface com o progresso
+            progress_callback: Função chamada com (hosts verificados, total) a cada host
+        """
+        return asyncio.run(self.scan_network_async(callback, progress_callback=progress_callback))
+    
+    async def scan_network_async(self, callback=None, concurrency=PING_CONCURRENCY, progress_callback=None):
+        """
+        Varre a rede usando ping em um único laço de eventos asyncio, sem
+        criar uma thread por host.
+        
         Args:
             callback: Função de callback para atualizar a interface com o progresso
+            concurrency: Número máximo de pings simultâneos
+            progress_callback: Função chamada com (hosts verificados, total) a cada host
         """
         self.is_scanning = True
         self.stop_scan_flag = False
         self.scan_results = {}
+        self.ttl_by_ip = {}
+        self.touch_results()
+        
+        # Executor dedicado às buscas de MAC e hostname, independente do padrão
+        enrich_executor = ThreadPoolExecutor(max_workers=ENRICHMENT_WORKERS, thread_name_prefix='enrich')
         
         try:
             # Obtém a rede a partir do IP local
             network = ipaddress.IPv4Network(self.network, strict=False)
-            total_hosts = sum(1 for _ in network.hosts())
+            hosts = self.get_host_addresses(network)
             
             print(f"Iniciando varredura de ping na rede {network}")
-            print(f"Total de hosts a verificar: {total_hosts}")
+            print(f"Total de hosts a verificar: {len(hosts)}")
             
             start_time = time.time()
+            loop = asyncio.get_running_loop()
+            semaphore = asyncio.Semaphore(concurrency)
+            total_hosts = len(hosts)
+            self.progress = (0, total_hosts)
             
-            # Cria threads para fazer ping em paralelo
-            q = Queue()
-            threads = []
-            num_threads = min(100, total_hosts)  # Limita o número de threads
-            
-            # Função que será executada por cada thread
-            def ping_worker():
-                while not self.stop_scan_flag:
-                    try:
-                        ip = q.get(block=False)
-                    except:
-                        break
-                    
-                    if self.ping(ip):
-                        mac = self.get_mac_address(ip)
-                        hostname = self.get_hostname(ip)
-                        
-                        self.scan_results[ip] = {
-                            'mac': mac,
-                            'hostname': hostname,
-                            'ports': {},
-                            'status': 'online',
-                            'os': {'name': 'Desconhecido', 'confidence': 0}
-                        }
-                        
-                        if callback:
-                            callback(ip, self.scan_results[ip])
-                    
-                    q.task_done()
+            def hosts_checked(count=1):
+                # Todas as sondagens rodam no mesmo laço; não há concorrência aqui
+                self.progress = (self.progress[0] + count, total_hosts)
+                if progress_callback:
+                    progress_callback(*self.progress)
             
-            # Adiciona todos os IPs à fila
-            for host in network.hosts():
-                q.put(str(host))
+            async def probe(ip):
+                async with semaphore:
+                    alive = not self.stop_scan_flag and await self.ping_async(ip)
+                hosts_checked()
+                if alive:
+                    await add_device(ip)
             
-            # Inicia as threads
-            for _ in range(num_threads):
-                t = threading.Thread(target=ping_worker)
-                t.daemon = True
-                t.start()
-                threads.append(t)
+            async def add_device(ip):
+                # MAC e hostname usam chamadas bloqueantes; rodam no executor próprio
+                mac, hostname = await asyncio.gather(
+                    loop.run_in_executor(enrich_executor, self.get_mac_address, ip),
+                    loop.run_in_executor(enrich_executor, self.get_hostname, ip)
+                )
+                
+                self.scan_results[ip] = {
+                    'mac': mac,
+                    'hostname': hostname,
+                    'ports': {},
+                    'status': 'online',
+                    'os': {'name': 'Desconhecido', 'confidence': 0}
+                }
+                self.touch_results()
+                
+                if callback:
+                    callback(ip, self.scan_results[ip])
             
-            # Espera a conclusão da varredura
-            q.join()
+            # Sonda todos os hosts de uma vez por um único socket ICMP; sem suporte
+            # a ICMP sem privilégios (ex: Windows), usa o ping do sistema por host
+            # (os endereços são convertidos em bloco para bytes em ordem de rede)
+            packed = hosts.astype('>u4').tobytes()
+            ips = [socket.inet_ntoa(packed[i:i + 4]) for i in range(0, len(packed), 4)]
+            alive_ips = await loop.run_in_executor(None, self.icmp_sweep, ips)
             
-            # Se a varredura foi interrompida, limpa as threads
-            if self.stop_scan_flag:
-                for _ in range(num_threads):
-                    if not q.empty():
-                        q.get()
-                        q.task_done()
+            if alive_ips is not None:
+                # A varredura preencheu a tabela ARP; uma única leitura serve a todos os hosts
+                await loop.run_in_executor(None, self._refresh_arp_cache)
+                self.ttl_by_ip = {ip: ttl for ip, ttl in alive_ips.items() if ttl is not None}
+                
+                # Os hosts que não responderam já estão verificados
+                hosts_checked(total_hosts - len(alive_ips))
+                
+                async def sweep_device(ip):
+                    await add_device(ip)
+                    hosts_checked()
+                
+                await asyncio.gather(*(sweep_device(ip) for ip in alive_ips))
+            else:
+                await asyncio.gather(*(probe(ip) for ip in ips))
             
             end_time = time.time()
             print(f"Varredura de ping concluída em {end_time - start_time:.2f} segundos")
@@ -234,10 +541,117 @@ class NetworkScanner:
         except Exception as e:
             print(f"Erro durante varredura de ping: {e}")
         finally:
+            enrich_executor.shutdown(wait=False)
             self.is_scanning = False
         
         return self.scan_results
     
+    def icmp_sweep(self, ips, timeout=ICMP_SWEEP_TIMEOUT):
+        """
+        Envia um ICMP Echo para todos os IPs por um único socket e coleta as respostas.
+        
+        Usa um socket ICMP sem privilégios (SOCK_DGRAM), disponível no Linux e
+        no macOS; sem ele, a varredura recorre ao ping do sistema por host.
+        
+        Args:
+            ips: Lista de endereços IP a verificar
+            timeout: Tempo de espera pelas respostas após o último envio
+            
+        Returns:
+            dict: IPs que responderam, na ordem de envio, com o TTL de cada
+            resposta (None se desconhecido), ou None se o socket ICMP não
+            estiver disponível
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except (OSError, AttributeError):
+            return None
+        
+        # O mesmo pacote serve para todos os hosts: as respostas são
+        # identificadas pelo IP de origem
+        packet = _build_icmp_echo(id(self) & 0xFFFF, 1)
+        pending = set(ips)
+        alive = {}
+        
+        def read_replies():
+            while True:
+                try:
+                    data, ancdata, _, (source, _) = sock.recvmsg(1024, socket.CMSG_SPACE(4))
+                except OSError:
+                    # Sem mais dados ou erro no socket (ex: ENOBUFS); encerra a
+                    # leitura e deixa o laço de espera chamar de novo
+                    return
+                
+                # TTL da resposta: dado auxiliar (Linux) ou cabeçalho IP, que
+                # alguns sistemas entregam junto com a mensagem ICMP
+                ttl = None
+                for level, kind, value in ancdata:
+                    if level == socket.IPPROTO_IP and kind == socket.IP_TTL:
+                        ttl = int.from_bytes(value[:4], sys.byteorder)
+                if data and data[0] >> 4 == 4:
+                    ttl = data[8]
+                    data = data[(data[0] & 0x0F) * 4:]
+                
+                # Tipo 0: Echo Reply
+                if data and data[0] == 0 and source in pending:
+                    alive[source] = ttl
+        
+        with sock:
+            sock.setblocking(False)
+            if IP_RECVTTL is not None:
+                try:
+                    sock.setsockopt(socket.IPPROTO_IP, IP_RECVTTL, 1)
+                except OSError:
+                    pass
+            
+            for ip in ips:
+                if self.stop_scan_flag:
+                    break
+                try:
+                    sock.sendto(packet, (ip, 0))
+                except BlockingIOError:
+                    # Buffer de envio cheio: espera ficar livre e tenta de novo
+                    select.select([], [sock], [], timeout)
+                    try:
+                        sock.sendto(packet, (ip, 0))
+                    except OSError:
+                        pass
+                except OSError:
+                    pass
+                
+                # Lê as respostas que já chegaram, para não encher o buffer de recepção
+                read_replies()
+            
+            # Aguarda as respostas restantes até o tempo limite
+            deadline = time.monotonic() + timeout
+            while len(alive) < len(pending) and not self.stop_scan_flag:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                readable, _, _ = select.select([sock], [], [], remaining)
+                if readable:
+                    read_replies()
+        
+        return {ip: alive[ip] for ip in ips if ip in alive}
+    
+    async def ping_async(self, ip):
+        """
+        Verifica, sem bloquear o laço de eventos, se um host está online usando ping.
+        
+        Args:
+            ip: Endereço IP a ser verificado
+            
+        Returns:
+            bool: True se o host responder, False caso contrário
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *PING_ARGS, ip, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            return await process.wait() == 0
+        except Exception:
+            return False
+    
     def ping(self, ip):
         """
         Verifica se um host está online usando ping.
@@ -248,21 +662,43 @@ class NetworkScanner:
         Returns:
             bool: True se o host responder, False caso contrário
         """
-        # Comando ping específico para Windows
-        if platform.system() == "Windows":
-            ping_cmd = f"ping -n 1 -w 1000 {ip}"
-        else:
-            ping_cmd = f"ping -c 1 -W 1 {ip}"
-        
         try:
-            # Executa o comando ping e verifica o código de retorno
-            return subprocess.call(ping_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True) == 0
+            # Executa o comando ping diretamente, sem um shell intermediário, e
+            # verifica o código de retorno
+            return subprocess.call([*PING_ARGS, ip], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
         except:
             return False
     
+    def _refresh_arp_cache(self):
+        """
+        Lê a tabela ARP do sistema de uma só vez para _arp_cache.
+        
+        No Linux lê /proc/net/arp diretamente; nos demais sistemas executa um
+        único "arp -a" para todos os hosts.
+        """
+        arp_cache = {}
+        try:
+            if sys.platform.startswith('linux'):
+                with open('/proc/net/arp') as f:
+                    next(f)  # Cabeçalho
+                    for line in f:
+                        fields = line.split()
+                        # Flags 0x0 indicam uma entrada incompleta (sem MAC)
+                        if len(fields) >= 4 and fields[2] != '0x0':
+                            arp_cache[fields[0]] = fields[3]
+            else:
+                output = subprocess.check_output(["arp", "-a"]).decode(errors='ignore')
+                for ip, mac in ARP_ENTRY_RE.findall(output):
+                    arp_cache[ip] = mac
+        except (OSError, subprocess.SubprocessError, StopIteration):
+            pass
+        
+        self._arp_cache = arp_cache
+        self._arp_cache_time = time.monotonic()
+    
     def get_mac_address(self, ip):
         """
-        Obtém o endereço MAC de um dispositivo.
+        Obtém o endereço MAC de um dispositivo a partir da tabela ARP do sistema.
         
         Args:
             ip: Endereço IP do dispositivo
@@ -270,19 +706,11 @@ class NetworkScanner:
         Returns:
             str: Endereço MAC ou None se não for possível obter
         """
-        if platform.system() == "Windows":
-            try:
-                # Usa o comando arp para obter o MAC
-                output = subprocess.check_output(f"arp -a {ip}", shell=True).decode()
-                for line in output.split('\n'):
-                    if ip in line:
-                        parts = line.split()
-                        for part in parts:
-                            if '-' in part or ':' in part:  # Formato de MAC address
-                                return part
-            except:
-                pass
-        return None
+        # Relê a tabela quando o IP não está nela, no máximo uma vez por
+        # ARP_CACHE_MAX_AGE, em vez de um processo "arp" por host
+        if ip not in self._arp_cache and time.monotonic() - self._arp_cache_time > ARP_CACHE_MAX_AGE:
+            self._refresh_arp_cache()
+        return self._arp_cache.get(ip)
     
     def get_hostname(self, ip):
         """
@@ -294,16 +722,27 @@ class NetworkScanner:
         Returns:
             str: Nome do host ou None se não for possível resolver
         """
+        # Reaproveita a consulta anterior, inclusive as que falharam, que
+        # costumam esperar todo o tempo limite do resolvedor
+        cached = self._hostname_cache.get(ip)
+        if cached and time.monotonic() - cached[0] < HOSTNAME_CACHE_TTL:
+            return cached[1]
+        
         try:
             hostname, _, _ = socket.gethostbyaddr(ip)
-            return hostname
         except:
-            return None
+            hostname = None
+        
+        self._hostname_cache[ip] = (time.monotonic(), hostname)
+        return hostname
     
     def scan_ports(self, ip, port_range=(1, 1024), callback=None):
         """
         Verifica portas abertas em um dispositivo.
         
+        As conexões rodam em um único laço asyncio (scan_ports_async), sem criar
+        uma thread por conexão; deve ser chamado fora de um laço de eventos.
+        
         Args:
             ip: Endereço IP do dispositivo
             port_range: Tupla com intervalo de portas (início, fim)
@@ -312,14 +751,36 @@ class NetworkScanner:
         Returns:
             dict: Dicionário com as portas abertas e seus serviços
         """
+        return asyncio.run(self.scan_ports_async(ip, port_range, callback))
+    
+    async def scan_ports_async(self, ip, port_range=(1, 1024), callback=None, concurrency=PORT_SCAN_CONCURRENCY):
+        """
+        Verifica portas abertas em um dispositivo sem bloquear o laço de eventos.
+        
+        Args:
+            ip: Endereço IP do dispositivo
+            port_range: Tupla com intervalo de portas (início, fim)
+            callback: Função de callback para atualizar a interface
+            concurrency: Número máximo de conexões simultâneas
+            
+        Returns:
+            dict: Dicionário com as portas abertas e seus serviços
+        """
+        loop = asyncio.get_running_loop()
+        
         if ip not in self.scan_results:
+            mac, hostname = await asyncio.gather(
+                loop.run_in_executor(None, self.get_mac_address, ip),
+                loop.run_in_executor(None, self.get_hostname, ip)
+            )
             self.scan_results[ip] = {
-                'mac': self.get_mac_address(ip),
-                'hostname': self.get_hostname(ip),
+                'mac': mac,
+                'hostname': hostname,
                 'ports': {},
                 'status': 'unknown',
                 'os': {'name': 'Desconhecido', 'confidence': 0}
             }
+            self.touch_results()
         
         open_ports = {}
         start_port, end_port = port_range
@@ -327,62 +788,33 @@ class NetworkScanner:
         print(f"Iniciando varredura de portas em {ip} (portas {start_port}-{end_port})")
         start_time = time.time()
         
-        # Cria threads para verificar portas em paralelo
-        q = Queue()
-        threads = []
-        num_threads = min(100, end_port - start_port + 1)
-        
-        # Função que será executada por cada thread
-        def port_scanner_worker():
-            while not self.stop_scan_flag:
-                try:
-                    port = q.get(block=False)
-                except:
-                    break
-                
-                try:
-                    # Cria um socket e tenta conectar à porta
-                    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    s.settimeout(0.5)
-                    result = s.connect_ex((ip, port))
-                    s.close()
-                    
-                    if result == 0:
-                        # Porta aberta, tenta identificar o serviço
-                        service = self.get_service_name(port)
-                        open_ports[port] = service
-                        
-                        # Atualiza os resultados
-                        self.scan_results[ip]['ports'][port] = service
-                        self.scan_results[ip]['status'] = 'online'
-                        
-                        if callback:
-                            callback(ip, port, service)
-                except:
-                    pass
-                
-                q.task_done()
-        
-        # Adiciona todas as portas à fila
-        for port in range(start_port, end_port + 1):
-            q.put(port)
-        
-        # Inicia as threads
-        for _ in range(num_threads):
-            t = threading.Thread(target=port_scanner_worker)
-            t.daemon = True
-            t.start()
-            threads.append(t)
-        
-        # Espera a conclusão da varredura
-        q.join()
+        def record_open_port(port):
+            # Porta aberta, tenta identificar o serviço
+            service = self.get_service_name(port)
+            open_ports[port] = service
+            
+            # Atualiza os resultados
+            self.scan_results[ip]['ports'][port] = service
+            self.scan_results[ip]['status'] = 'online'
+            self.touch_results()
+            
+            if callback:
+                callback(ip, port, service)
         
-        # Se a varredura foi interrompida, limpa as threads
-        if self.stop_scan_flag:
-            for _ in range(num_threads):
-                if not q.empty():
-                    q.get()
-                    q.task_done()
+        # Com privilégios, envia apenas SYNs por um socket bruto; caso contrário,
+        # faz conexões completas por um único seletor. Ambas rodam em uma thread
+        # de trabalho e registram as portas abertas de volta no laço de eventos
+        port_scan = self._syn_scan if _raw_tcp_available() else self._connect_scan
+        cancelled = threading.Event()
+        try:
+            await loop.run_in_executor(
+                None, port_scan, ip, range(start_port, end_port + 1),
+                lambda port: loop.call_soon_threadsafe(record_open_port, port),
+                concurrency, cancelled
+            )
+        finally:
+            # Interrompe a thread se a varredura for cancelada
+            cancelled.set()
         
         end_time = time.time()
         print(f"Varredura de portas concluída em {end_time - start_time:.2f} segundos")
@@ -391,15 +823,180 @@ class NetworkScanner:
         # Detecta o sistema operacional após a varredura de portas
         if self.os_detector and open_ports:
             print(f"Detectando sistema operacional de {ip}...")
-            os_result = self.os_detector.detect_os(ip, open_ports)
+            os_result = await loop.run_in_executor(
+                None, self.os_detector.detect_os, ip, open_ports, self.ttl_by_ip.get(ip)
+            )
             self.scan_results[ip]['os'] = {
                 'name': os_result['os'],
                 'confidence': os_result['confidence']
             }
+            self.touch_results()
             print(f"Sistema operacional detectado: {os_result['os']} (Confiança: {os_result['confidence']:.1f}%)")
         
         return open_ports
     
+    def _connect_scan(self, ip, ports, on_open, concurrency=PORT_SCAN_CONCURRENCY,
+                      cancelled=None, timeout=PORT_CONNECT_TIMEOUT):
+        """
+        Testa conexões TCP em várias portas com um único seletor (epoll, kqueue
+        ou select), mantendo até `concurrency` connect() não bloqueantes em andamento.
+        
+        Args:
+            ip: Endereço IP do dispositivo
+            ports: Portas a testar
+            on_open: Função chamada com o número de cada porta aberta
+            concurrency: Número máximo de conexões simultâneas
+            cancelled: threading.Event que interrompe a varredura (opcional)
+            timeout: Tempo limite (segundos) de cada conexão
+        """
+        ports = iter(ports)
+        # Sockets na ordem de registro, que é também a ordem dos prazos
+        pending = deque()
+        
+        def stopped():
+            return self.stop_scan_flag or (cancelled is not None and cancelled.is_set())
+        
+        with selectors.DefaultSelector() as sel:
+            try:
+                while True:
+                    # Inicia novas conexões até o limite de simultâneas (conta
+                    # apenas os sockets ainda registrados no seletor)
+                    while len(sel.get_map()) < concurrency and not stopped():
+                        port = next(ports, None)
+                        if port is None:
+                            break
+                        
+                        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                        s.setblocking(False)
+                        s.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+                        err = s.connect_ex((ip, port))
+                        if err in CONNECT_IN_PROGRESS:
+                            sel.register(s, selectors.EVENT_WRITE, (port, time.monotonic() + timeout))
+                            pending.append(s)
+                            continue
+                        
+                        s.close()
+                        if err == 0:
+                            on_open(port)
+                    
+                    # Retira do início da fila as conexões já concluídas e
+                    # encerra as que esgotaram o prazo
+                    now = time.monotonic()
+                    while pending:
+                        s = pending[0]
+                        if s.fileno() != -1 and sel.get_key(s).data[1] > now:
+                            break
+                        pending.popleft()
+                        if s.fileno() != -1:
+                            sel.unregister(s)
+                            s.close()
+                    
+                    if not pending or stopped():
+                        break
+                    
+                    # Conexões concluídas (com sucesso ou não) ficam graváveis
+                    wait = sel.get_key(pending[0]).data[1] - time.monotonic()
+                    for key, _ in sel.select(max(wait, 0)):
+                        s = key.fileobj
+                        sel.unregister(s)
+                        if s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                            on_open(key.data[0])
+                        s.close()
+            finally:
+                for s in pending:
+                    s.close()
+    
+    def _syn_scan(self, ip, ports, on_open, concurrency=PORT_SCAN_CONCURRENCY,
+                  cancelled=None, timeout=PORT_CONNECT_TIMEOUT):
+        """
+        Varredura SYN: envia apenas o SYN de cada porta por um socket TCP bruto e
+        considera abertas as portas que respondem com SYN-ACK, sem completar o
+        handshake (o kernel responde com RST). Requer privilégios; sem eles,
+        usa _connect_scan.
+        
+        Args:
+            ip: Endereço IP do dispositivo
+            ports: Portas a testar
+            on_open: Função chamada com o número de cada porta aberta
+            concurrency: Número de SYNs enviados entre leituras das respostas
+            cancelled: threading.Event que interrompe a varredura (opcional)
+            timeout: Tempo (segundos) de espera pelas respostas após o último SYN
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        except OSError:
+            return self._connect_scan(ip, ports, on_open, concurrency, cancelled, timeout)
+        
+        def stopped():
+            return self.stop_scan_flag or (cancelled is not None and cancelled.is_set())
+        
+        # Endereço de origem usado pelo kernel para chegar ao destino; sem rota,
+        # deixa a varredura por conexão reportar as portas como fechadas
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+                probe.connect((ip, 9))
+                src_ip = probe.getsockname()[0]
+        except OSError:
+            sock.close()
+            return self._connect_scan(ip, ports, on_open, concurrency, cancelled, timeout)
+        
+        with sock:
+            src_port = random.randint(32768, 60999)
+            seq = random.getrandbits(32)
+            expected_ack = (seq + 1) & 0xFFFFFFFF
+            dst_addr = socket.inet_aton(ip)
+            found = set()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SYN_SCAN_RCVBUF)
+            sock.setblocking(False)
+            
+            def read_replies():
+                while True:
+                    try:
+                        data = sock.recv(65535)
+                    except OSError:
+                        # Sem mais dados (ou erro no socket); encerra a leitura
+                        return
+                    
+                    # O socket bruto recebe o cabeçalho IP seguido do segmento TCP
+                    ihl = (data[0] & 0x0F) * 4
+                    if len(data) < ihl + 14 or data[12:16] != dst_addr:
+                        continue
+                    port, dst_port, _, ack = struct.unpack_from('!HHII', data, ihl)
+                    flags = data[ihl + 13]
+                    if (dst_port == src_port and ack == expected_ack
+                            and flags & TCP_SYN_ACK == TCP_SYN_ACK and port not in found):
+                        found.add(port)
+                        on_open(port)
+            
+            # Envia os SYNs em lotes, lendo as respostas entre um lote e outro
+            ports = iter(ports)
+            for batch in iter(lambda: list(itertools.islice(ports, concurrency)), []):
+                if stopped():
+                    return
+                for port in batch:
+                    packet = _build_tcp_syn(src_ip, ip, src_port, port, seq)
+                    while True:
+                        try:
+                            sock.sendto(packet, (ip, 0))
+                            break
+                        except BlockingIOError:
+                            # Buffer de envio cheio; espera até poder enviar
+                            select.select([], [sock], [], timeout)
+                        except OSError:
+                            # Erro de envio (ex: destino inalcançável); porta não respondida
+                            break
+                read_replies()
+            
+            # Aguarda as respostas restantes até o tempo limite
+            deadline = time.monotonic() + timeout
+            while not stopped():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                readable, _, _ = select.select([sock], [], [], remaining)
+                if readable:
+                    read_replies()
+    
     def get_service_name(self, port):
         """
         Obtém o nome do serviço associado a uma porta.
@@ -410,32 +1007,7 @@ class NetworkScanner:
         Returns:
             str: Nome do serviço ou "unknown"
         """
-        try:
-            return socket.getservbyport(port)
-        except:
-            # Serviços comuns que podem não estar no banco de dados
-            common_ports = {
-                21: "FTP",
-                22: "SSH",
-                23: "Telnet",
-                25: "SMTP",
-                53: "DNS",
-                80: "HTTP",
-                110: "POP3",
-                115: "SFTP",
-                135: "RPC",
-                139: "NetBIOS",
-                143: "IMAP",
-                194: "IRC",
-                443: "HTTPS",
-                445: "SMB",
-                1433: "MSSQL",
-                3306: "MySQL",
-                3389: "RDP",
-                5900: "VNC",
-                8080: "HTTP-Proxy"
-            }
-            return common_ports.get(port, "unknown")
+        return _service_name(port)
     
     def stop_scan(self):
         """Interrompe qualquer varredura em andamento."""
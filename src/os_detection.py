@@ -8,13 +8,24 @@ Este módulo contém funções para detectar o sistema operacional dos dispositi
 baseado em técnicas como análise de TTL, portas abertas e banners de serviços.
 """
 
-import socket
+import asyncio
 import re
 import subprocess
 import platform
-import time
 from collections import Counter
 
+# Sistema operacional, consultado uma única vez
+IS_WINDOWS = platform.system() == "Windows"
+
+# Valor TTL na saída do ping ("TTL=" no Windows, "ttl=" nos demais), procurado
+# diretamente nos bytes, sem decodificar a saída
+TTL_RE = re.compile(rb'TTL=(\d+)', re.IGNORECASE)
+
+# Portas HTTP, cujos servidores só respondem após uma requisição; o cabeçalho
+# Server da resposta serve de banner
+HTTP_BANNER_PORTS = frozenset([80, 8080])
+HTTP_BANNER_REQUEST = b'HEAD / HTTP/1.0\r\n\r\n'
+
 class OSDetector:
     """Classe para detecção de sistema operacional de dispositivos na rede."""
     
@@ -28,47 +39,48 @@ class OSDetector:
             255: ["FreeBSD", "Network Equipment"]
         }
         
-        # Dicionário de portas comuns por sistema operacional
+        # Dicionário de portas comuns por sistema operacional (conjuntos, para
+        # contar as portas abertas com uma interseção)
         self.os_port_signatures = {
-            "Windows": [135, 139, 445, 3389],
-            "Linux": [22, 111, 2049],
-            "macOS": [22, 548, 5009, 7000],
-            "FreeBSD": [22, 80],
-            "Network Equipment": [22, 23, 80, 443]
+            "Windows": frozenset([135, 139, 445, 3389]),
+            "Linux": frozenset([22, 111, 2049]),
+            "macOS": frozenset([22, 548, 5009, 7000]),
+            "FreeBSD": frozenset([22, 80]),
+            "Network Equipment": frozenset([22, 23, 80, 443])
         }
         
         # Expressões regulares para identificar sistemas operacionais em banners
         self.banner_signatures = {
-            "Windows": [
-                re.compile(r'Microsoft|Windows', re.IGNORECASE),
-                re.compile(r'IIS', re.IGNORECASE)
-            ],
-            "Linux": [
-                re.compile(r'Linux|Ubuntu|Debian|CentOS|Fedora|Red Hat|RHEL', re.IGNORECASE),
-                re.compile(r'Apache', re.IGNORECASE)
-            ],
-            "macOS": [
-                re.compile(r'Mac OS|macOS|Darwin', re.IGNORECASE)
-            ],
-            "FreeBSD": [
-                re.compile(r'FreeBSD|OpenBSD|NetBSD', re.IGNORECASE)
-            ],
-            "Network Equipment": [
-                re.compile(r'Cisco|Juniper|Huawei|Mikrotik|RouterOS', re.IGNORECASE)
-            ]
+            "Windows": [r'Microsoft|Windows', r'IIS'],
+            "Linux": [r'Linux|Ubuntu|Debian|CentOS|Fedora|Red Hat|RHEL', r'Apache'],
+            "macOS": [r'Mac OS|macOS|Darwin'],
+            "FreeBSD": [r'FreeBSD|OpenBSD|NetBSD'],
+            "Network Equipment": [r'Cisco|Juniper|Huawei|Mikrotik|RouterOS']
         }
+        
+        # Todas as assinaturas em uma única expressão, com um grupo nomeado por
+        # sistema operacional, para percorrer cada banner uma só vez
+        self._banner_group_os = {}
+        groups = []
+        for i, (os_name, patterns) in enumerate(self.banner_signatures.items()):
+            group = f"os{i}"
+            self._banner_group_os[group] = os_name
+            groups.append(f"(?P<{group}>{'|'.join(patterns)})")
+        self._banner_regex = re.compile('|'.join(groups), re.IGNORECASE)
     
-    def detect_os_by_ttl(self, ip):
+    def detect_os_by_ttl(self, ip, ttl=None):
         """
         Detecta o sistema operacional baseado no valor TTL.
         
         Args:
             ip: Endereço IP do dispositivo
+            ttl: TTL já conhecido (ex: da varredura ICMP); se None, faz um ping
             
         Returns:
             tuple: (ttl, lista_de_sistemas_operacionais_possiveis)
         """
-        ttl = self._get_ttl(ip)
+        if ttl is None:
+            ttl = self._get_ttl(ip)
         if ttl is None:
             return None, ["Desconhecido"]
         
@@ -96,27 +108,18 @@ class OSDetector:
         Returns:
             int: Valor TTL ou None se não for possível obter
         """
+        # Comando ping específico para Windows
+        ping_args = ["ping", "-n", "1", ip] if IS_WINDOWS else ["ping", "-c", "1", ip]
+        
         try:
-            # Comando ping específico para Windows
-            if platform.system() == "Windows":
-                ping_cmd = f"ping -n 1 {ip}"
-                output = subprocess.check_output(ping_cmd, shell=True).decode()
-                
-                # Procura pelo valor TTL na saída
-                ttl_match = re.search(r'TTL=(\d+)', output, re.IGNORECASE)
-                if ttl_match:
-                    return int(ttl_match.group(1))
-            else:
-                # Para outros sistemas, usa um comando diferente
-                ping_cmd = f"ping -c 1 {ip}"
-                output = subprocess.check_output(ping_cmd, shell=True).decode()
-                
-                # Procura pelo valor TTL na saída
-                ttl_match = re.search(r'ttl=(\d+)', output, re.IGNORECASE)
-                if ttl_match:
-                    return int(ttl_match.group(1))
-        except:
-            pass
+            output = subprocess.check_output(ping_args)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        
+        # Procura pelo valor TTL na saída
+        ttl_match = TTL_RE.search(output)
+        if ttl_match:
+            return int(ttl_match.group(1))
         
         return None
     
@@ -135,11 +138,12 @@ class OSDetector:
             return {}
         
         scores = {}
+        open_set = open_ports if isinstance(open_ports, (set, frozenset)) else frozenset(open_ports)
         
         # Calcula a pontuação para cada sistema operacional
         for os_name, signature_ports in self.os_port_signatures.items():
             # Conta quantas portas da assinatura estão abertas
-            matches = sum(1 for port in signature_ports if port in open_ports)
+            matches = len(signature_ports & open_set)
             
             # Calcula a pontuação como porcentagem de correspondência
             if matches > 0:
@@ -148,9 +152,9 @@ class OSDetector:
         
         return scores
     
-    def get_service_banner(self, ip, port, timeout=1):
+    async def get_service_banner(self, ip, port, timeout=1):
         """
-        Tenta obter o banner de um serviço.
+        Tenta obter o banner de um serviço, sem bloquear o laço de eventos.
         
         Args:
             ip: Endereço IP do dispositivo
@@ -161,21 +165,26 @@ class OSDetector:
             str: Banner do serviço ou None se não for possível obter
         """
         try:
-            # Cria um socket e tenta conectar à porta
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(timeout)
-            s.connect((ip, port))
-            
-            # Espera um pouco para receber dados
-            time.sleep(0.2)
+            # Tenta conectar à porta
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        
+        try:
+            # Serviços HTTP não enviam nada antes de receber uma requisição
+            if port in HTTP_BANNER_PORTS:
+                writer.write(HTTP_BANNER_REQUEST)
+                await writer.drain()
             
-            # Tenta receber o banner
-            banner = s.recv(1024).decode('utf-8', errors='ignore').strip()
-            s.close()
+            # Recebe o banner assim que chegar, até o tempo limite
+            data = await asyncio.wait_for(reader.read(1024), timeout)
+            banner = data.decode('utf-8', errors='ignore').strip()
             
             return banner if banner else None
-        except:
+        except (OSError, asyncio.TimeoutError):
             return None
+        finally:
+            writer.close()
     
     def detect_os_by_banners(self, ip, open_ports):
         """
@@ -203,41 +212,40 @@ class OSDetector:
         # Limita a 5 portas para não demorar muito
         ports_to_check = ports_to_check[:5]
         
-        # Obtém os banners
-        for port in ports_to_check:
-            banner = self.get_service_banner(ip, port)
-            if banner:
-                banners[port] = banner
+        # Obtém os banners de todas as portas ao mesmo tempo (esta função roda
+        # fora de um laço de eventos, em uma thread de trabalho)
+        async def fetch_banners():
+            return await asyncio.gather(*(self.get_service_banner(ip, port) for port in ports_to_check))
+        
+        if ports_to_check:
+            for port, banner in zip(ports_to_check, asyncio.run(fetch_banners())):
+                if banner:
+                    banners[port] = banner
         
         # Se não obteve nenhum banner, retorna vazio
         if not banners:
             return {}
         
-        # Analisa os banners para cada sistema operacional
-        for os_name, patterns in self.banner_signatures.items():
-            matches = 0
-            
-            # Verifica cada banner contra os padrões
-            for banner in banners.values():
-                for pattern in patterns:
-                    if pattern.search(banner):
-                        matches += 1
-                        break
-            
-            # Calcula a pontuação
-            if matches > 0:
-                score = (matches / len(banners)) * 100
-                scores[os_name] = score
+        # Conta em quantos banners cada sistema operacional aparece, com uma
+        # única passada da expressão combinada por banner
+        matches = Counter()
+        for banner in banners.values():
+            matches.update({self._banner_group_os[m.lastgroup] for m in self._banner_regex.finditer(banner)})
+        
+        # Calcula a pontuação
+        for os_name, count in matches.items():
+            scores[os_name] = (count / len(banners)) * 100
         
         return scores
     
-    def detect_os(self, ip, open_ports=None):
+    def detect_os(self, ip, open_ports=None, ttl=None):
         """
         Detecta o sistema operacional usando múltiplas técnicas.
         
         Args:
             ip: Endereço IP do dispositivo
             open_ports: Lista de portas abertas (opcional)
+            ttl: TTL já conhecido da varredura ICMP (opcional; evita um novo ping)
             
         Returns:
             dict: Informações sobre o sistema operacional detectado
@@ -254,7 +262,7 @@ class OSDetector:
         }
         
         # Detecta por TTL
-        ttl, ttl_os = self.detect_os_by_ttl(ip)
+        ttl, ttl_os = self.detect_os_by_ttl(ip, ttl)
         result['details']['ttl'] = ttl
         result['details']['ttl_os'] = ttl_os
         
@@ -272,26 +280,20 @@ class OSDetector:
             banner_scores = self.detect_os_by_banners(ip, open_ports)
             result['details']['banner_scores'] = banner_scores
             
-            # Combina os resultados
-            combined_scores = {}
-            
-            # Adiciona pontuação do TTL
-            for os_name in ttl_os:
-                combined_scores[os_name] = combined_scores.get(os_name, 0) + 40  # TTL tem peso 40%
-            
-            # Adiciona pontuação das portas
-            for os_name, score in port_scores.items():
-                combined_scores[os_name] = combined_scores.get(os_name, 0) + (score * 0.3)  # Portas têm peso 30%
+            # Combina os resultados em um único acumulador
+            # TTL tem peso 40%
+            combined_scores = Counter(dict.fromkeys(ttl_os, 40))
             
-            # Adiciona pontuação dos banners
-            for os_name, score in banner_scores.items():
-                combined_scores[os_name] = combined_scores.get(os_name, 0) + (score * 0.3)  # Banners têm peso 30%
+            # Portas e banners têm peso 30% cada
+            for scores in (port_scores, banner_scores):
+                for os_name, score in scores.items():
+                    combined_scores[os_name] += score * 0.3
             
             # Encontra o sistema operacional com maior pontuação
             if combined_scores:
-                best_os = max(combined_scores.items(), key=lambda x: x[1])
-                result['os'] = best_os[0]
-                result['confidence'] = min(best_os[1], 100)  # Limita a confiança a 100%
+                best_os, best_score = combined_scores.most_common(1)[0]
+                result['os'] = best_os
+                result['confidence'] = min(best_score, 100)  # Limita a confiança a 100%
         else:
             # Se não tiver portas, usa apenas o TTL
             if ttl_os and ttl_os[0] != "Desconhecido":